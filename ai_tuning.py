@@ -0,0 +1,275 @@
+# AI策略参数调优
+"""
+规则AI策略参数（source/strategy_params.py）的并行调优工具
+
+1. 在基准参数（默认AI-1）附近随机生成一批候选参数，第0个候选就是基准参数本身（对照组）
+2. 逐轮淘汰（successive halving）：每轮所有存活的候选在同一批随机种子（相同的发牌）上对局，
+   按平均每局得分排序，保留前1/eta，下一轮对局数乘以eta
+3. 每个种子对局4次，候选参数轮流坐4个座位，其他3家为基准AI，抵消座位和起手牌的影响
+4. 对局用source/headless的无界面对局引擎；得分为候选座位每局的积分变化（GameManager.count_all计算的鸡分差），同时统计胡牌率和点炮率（game_over中的统计）
+5. 对局分散到进程池执行，每完成一批就写入检查点，中断后用 --resume 继续
+
+用法：
+    python ai_tuning.py                            # 16个候选，首轮每个候选8个种子（32局）
+    python ai_tuning.py --candidates 32 --seeds 16 --eta 2
+    python ai_tuning.py --workers 4 --checkpoint tuning.json
+    python ai_tuning.py --resume --checkpoint tuning.json
+"""
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, replace
+from typing import Dict, List, Tuple
+from majiangAI import MajiangStrategy
+from source.headless import HeadlessRunner
+from source.strategy_params import AI0_PARAMS, AI1_PARAMS, StrategyParams
+
+# 可调参数及取值范围：元组参数用(字段名, 下标)表示其中一项
+SEARCH_SPACE = {
+    "middle_stage_used": (50, 85),
+    "late_stage_used": (85, 105),
+    "level_triplet": (3, 7),
+    "level_only_pair": (2, 6),
+    "level_pair": (1, 5),
+    "level_connected": (1, 4),
+    "level_gapped": (0, 3),
+    "chicken_charge_delta": (-5, 0),
+    "chicken_cross_delta": (-4, 0),
+    "chicken_keep_delta": (0, 6),
+    "flush_suit_count": (7, 11),
+    "late_safe_danger": (0.0, 30.0),
+    ("danger_weights", 0): (0.0, 1.0),
+    ("danger_weights", 1): (0.0, 1.5),
+    ("danger_weights", 2): (0.3, 2.0),
+    "shanten_weight": (0.0, 100.0),
+    "effective_weight": (0.0, 3.0),
+    ("ting_bonuses", 0): (-400.0, -50.0),
+    ("ting_bonuses", 1): (-500.0, -100.0),
+    ("ting_bonuses", 2): (-800.0, -200.0),
+    "peng_risk_limit": (0.05, 0.3),
+    "qiang_gang_risk_limit": (0.03, 0.3),
+}
+
+# 基准参数
+BASELINES = {"0": AI0_PARAMS, "1": AI1_PARAMS}
+
+# 进程内的无界面对局（每个进程创建一次）
+_runner: HeadlessRunner = None
+
+
+# ==================== 参数 ====================
+
+def params_to_dict(params: StrategyParams) -> Dict:
+    """参数转换为可写入JSON的字典"""
+    return {key: list(value) if isinstance(value, tuple) else value for key, value in asdict(params).items()}
+
+
+def params_from_dict(data: Dict) -> StrategyParams:
+    """从字典还原参数"""
+    return StrategyParams(**{key: tuple(value) if isinstance(value, list) else value for key, value in data.items()})
+
+
+def sample_candidate(base: StrategyParams, rng: random.Random, mutation: float) -> StrategyParams:
+    """
+    在基准参数附近随机生成一个候选：每个可调参数以mutation的概率在取值范围内重新取值
+
+    Args:
+        base: 基准参数
+        rng: 随机数生成器
+        mutation: 每个参数被修改的概率
+    """
+    data = asdict(base)
+    for key, (low, high) in SEARCH_SPACE.items():
+        if rng.random() >= mutation:
+            continue
+        value = rng.randint(low, high) if isinstance(low, int) else round(rng.uniform(low, high), 3)
+        if isinstance(key, tuple):
+            name, index = key
+            values = list(data[name])
+            values[index] = value
+            data[name] = tuple(values)
+        else:
+            data[key] = value
+    return replace(base, **data)
+
+
+# ==================== 对局 ====================
+
+def evaluate(task: Tuple[Dict, str, List[int]]) -> Dict:
+    """
+    进程池任务：在一组种子上评估一个候选参数，每个种子候选轮流坐4个座位
+
+    Args:
+        task: (候选参数字典, 基准AI版本, 种子列表)
+
+    Returns:
+        dict: 每个种子的[积分变化, 胡牌次数, 点炮次数, 对局数]
+    """
+    global _runner
+    if _runner is None:
+        _runner = HeadlessRunner()
+    params, baseline_version, seeds = task
+    candidate = MajiangStrategy(params_from_dict(params))
+    baseline = MajiangStrategy(BASELINES[baseline_version])
+    results = {}
+    for seed in seeds:
+        record = [0, 0, 0, 0]
+        for seat in range(4):
+            # 候选坐在seat，其余座位为基准AI
+            for index in range(4):
+                _runner.set_ai(index, candidate if index == seat else baseline)
+            game = _runner.play_game(seed)
+            record[0] += game.score_deltas[seat]
+            record[1] += seat in game.winners
+            record[2] += game.deal_ins[seat]
+            record[3] += 1
+        results[str(seed)] = record
+    return results
+
+
+# ==================== 逐轮淘汰 ====================
+
+class Tuner:
+    """
+    逐轮淘汰调优，状态保存在检查点文件中
+
+    Args:
+        args: 命令行参数
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.path = args.checkpoint
+        if args.resume and os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.state = json.load(f)
+            print(f"从检查点继续：{self.path}，第{self.state['round'] + 1}轮")
+        else:
+            self.state = self._new_state()
+
+    def _new_state(self) -> Dict:
+        """生成候选参数和首轮种子"""
+        args = self.args
+        rng = random.Random(args.seed)
+        base = BASELINES[args.baseline]
+        candidates = [base] + [sample_candidate(base, rng, args.mutation) for _ in range(args.candidates - 1)]
+        return {
+            "baseline": args.baseline,
+            "round": 0,
+            "seeds": [rng.randrange(2 ** 31) for _ in range(args.seeds)],
+            "seed_rng": rng.randrange(2 ** 31),
+            "candidates": [{"id": i, "params": params_to_dict(p), "results": {}} for i, p in enumerate(candidates)],
+            "alive": list(range(len(candidates))),
+        }
+
+    def save(self):
+        """写入检查点（先写临时文件再替换，避免中断时损坏）"""
+        temp = self.path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=1)
+        os.replace(temp, self.path)
+
+    @staticmethod
+    def summary(candidate: Dict, seeds: List[int]) -> Tuple[float, float, float, int]:
+        """候选在指定种子上的(平均每局得分, 胡牌率, 点炮率, 对局数)"""
+        records = [candidate["results"][str(seed)] for seed in seeds if str(seed) in candidate["results"]]
+        games = sum(record[3] for record in records)
+        if not games:
+            return 0.0, 0.0, 0.0, 0
+        return (sum(record[0] for record in records) / games,
+                sum(record[1] for record in records) / games,
+                sum(record[2] for record in records) / games,
+                games)
+
+    def run(self):
+        """逐轮评估存活的候选，直到只剩一个或达到最大轮数"""
+        args = self.args
+        state = self.state
+        with ProcessPoolExecutor(max_workers=args.workers or None) as executor:
+            while True:
+                self.run_round(executor)
+                alive = state["alive"]
+                if len(alive) <= 1 or state["round"] + 1 >= args.rounds:
+                    break
+                # 淘汰：保留前1/eta，种子数乘以eta（保留已有种子，已完成的对局不重复计算）
+                alive.sort(key=lambda i: self.summary(state["candidates"][i], state["seeds"])[0], reverse=True)
+                state["alive"] = alive[:max(1, len(alive) // args.eta)]
+                rng = random.Random(state["seed_rng"] + state["round"])
+                state["seeds"] += [rng.randrange(2 ** 31) for _ in range(len(state["seeds"]) * (args.eta - 1))]
+                state["round"] += 1
+                self.save()
+        self.report()
+
+    def run_round(self, executor: ProcessPoolExecutor):
+        """当前轮：每个存活候选在全部种子上对局，按批提交到进程池，每完成一批写一次检查点"""
+        args = self.args
+        state = self.state
+        seeds = state["seeds"]
+        tasks = []
+        for i in state["alive"]:
+            candidate = state["candidates"][i]
+            todo = [seed for seed in seeds if str(seed) not in candidate["results"]]
+            for start in range(0, len(todo), args.batch):
+                tasks.append((i, (candidate["params"], state["baseline"], todo[start:start + args.batch])))
+        print(f"\n第{state['round'] + 1}轮：{len(state['alive'])}个候选，每个候选{len(seeds)}个种子（{len(seeds) * 4}局）")
+
+        start_time = time.time()
+        games = 0
+        futures = [(i, executor.submit(evaluate, task)) for i, task in tasks]
+        for i, future in futures:
+            results = future.result()
+            state["candidates"][i]["results"].update(results)
+            games += sum(record[3] for record in results.values())
+            self.save()
+        elapsed = time.time() - start_time
+        if games:
+            print(f"对局{games}局，用时{elapsed:.1f}秒，{games / elapsed:.1f}局/秒")
+        self.print_ranking()
+
+    def print_ranking(self):
+        """打印当前轮存活候选的排名"""
+        state = self.state
+        ranking = sorted(state["alive"], key=lambda i: self.summary(state["candidates"][i], state["seeds"])[0], reverse=True)
+        print(f"{'候选':>4} {'每局得分':>8} {'胡牌率':>7} {'点炮率':>7} {'局数':>5}")
+        for i in ranking:
+            score, win_rate, deal_in_rate, games = self.summary(state["candidates"][i], state["seeds"])
+            tag = "（基准）" if i == 0 else ""
+            print(f"{i:>4} {score:>+8.2f} {win_rate:>7.1%} {deal_in_rate:>7.1%} {games:>5} {tag}")
+
+    def report(self):
+        """输出最优候选与基准参数不同的字段"""
+        state = self.state
+        best = max(state["alive"], key=lambda i: self.summary(state["candidates"][i], state["seeds"])[0])
+        params = state["candidates"][best]["params"]
+        base = params_to_dict(BASELINES[state["baseline"]])
+        print(f"\n最优候选：{best}")
+        for key, value in params.items():
+            if value != base[key]:
+                print(f"    {key}: {base[key]} -> {value}")
+        self.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="规则AI策略参数并行调优（逐轮淘汰）")
+    parser.add_argument("--baseline", choices=sorted(BASELINES), default="1", help="基准参数：对照组和对手AI")
+    parser.add_argument("--candidates", type=int, default=16, help="候选参数数量（含基准参数）")
+    parser.add_argument("--seeds", type=int, default=8, help="首轮每个候选的种子数，每个种子对局4次")
+    parser.add_argument("--eta", type=int, default=2, help="每轮保留1/eta的候选，种子数乘以eta")
+    parser.add_argument("--rounds", type=int, default=10, help="最大轮数")
+    parser.add_argument("--mutation", type=float, default=0.3, help="生成候选时每个参数被修改的概率")
+    parser.add_argument("--workers", type=int, default=0, help="进程数，0表示使用全部CPU核心")
+    parser.add_argument("--batch", type=int, default=4, help="每个进程池任务的种子数")
+    parser.add_argument("--seed", type=int, default=0, help="生成候选和种子的随机种子")
+    parser.add_argument("--checkpoint", default="ai_tuning.json", help="检查点文件")
+    parser.add_argument("--resume", action="store_true", help="从检查点继续")
+    args = parser.parse_args()
+    if args.eta < 2:
+        parser.error("--eta 至少为2")
+    Tuner(args).run()
+
+
+if __name__ == "__main__":
+    main()
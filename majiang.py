@@ -3,6 +3,7 @@
 
 import pygame
 import sys
+import multiprocessing
 import os
 import time
 from settings import Settings
@@ -1732,6 +1733,8 @@ class MajiangGame:
         game_result = {
             'timestamp': datetime.now().isoformat(),
             'game_number': self.game_manager.total_games,
+            'seed': self.game_manager.seed,  # 本局随机种子，相同种子和庄家可以复现发牌
+            'banker': self.game_manager.banker.name if self.game_manager.banker else None,
             'total_games': total_games,
             'draw_games': draw_games,
             'draw_rate': draw_rate,
@@ -1792,6 +1795,9 @@ class MajiangGame:
         with open(file_path, 'w', encoding='utf-8') as f:
             json.dump(game_result, f, ensure_ascii=False, indent=2)
 
+        # 动作日志：game_{局数}.actions，可用source/replay回放
+        self.game_manager.action_log.save(os.path.join(self.history_folder_path, f"game_{self.game_manager.total_games}.actions"))
+
         print(f"第{self.game_manager.total_games}局游戏记录已保存到: {file_path}")
  
     def _save_game_history(self):
@@ -1973,6 +1979,8 @@ class MajiangGame:
         sys.exit()
 
 if __name__ == "__main__":
+    # 打包成exe后，蒙特卡洛AI的进程池子进程需要先经过freeze_support
+    multiprocessing.freeze_support()
     # 创建游戏实例
     game = MajiangGame()
     # 运行游戏主循环
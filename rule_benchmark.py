@@ -0,0 +1,313 @@
+# 规则引擎基准测试与差分验证
+"""
+规则引擎(source/rule.py)的基准测试和差分验证工具
+
+1. 穷举所有清一色手牌：14张的每种摸牌方式检查check_hu，13张的检查check_ting
+2. 随机生成带碰/杠副露的混合花色手牌，检查check_hu、check_ting和has_passport
+3. 统计每个接口的调用速度（次/秒）和延迟分位数(p50/p99)
+4. 与参考实现逐手对比，报告所有不一致的手牌
+   参考实现按原始的牌面字符串逻辑逐条判断胡牌牌型，常规胡牌用回溯穷举所有拆法（不依赖分解表）
+5. 安装了numpy时，同时对比source/batch_rule的批量判断结果
+
+用法：
+    python rule_benchmark.py                 # 穷举万字清一色 + 2万手随机混合手牌
+    python rule_benchmark.py --all-suits     # 穷举三种花色的清一色
+    python rule_benchmark.py --sample 5000   # 清一色手牌随机抽样5000手，快速检查
+    python rule_benchmark.py --cache         # 保留胡牌/听牌缓存（默认关闭缓存，测量原始速度）
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from itertools import product
+from typing import Callable, Dict, List, Tuple
+from source.public import Tag
+from source.rule import Rule
+from source.tile import TILE, TILE_SUITS, TILE_VALUES, TILES
+
+
+# ==================== 参考实现 ====================
+
+def reference_is_normal_win(tiles: List[str], needed: int) -> bool:
+    """常规胡牌参考实现：枚举将牌，再回溯穷举刻子/顺子的所有拆法"""
+    if len(tiles) != needed * 3 + 2:
+        return False
+    counts = Counter(tiles)
+    # 同一种牌超过4张不可能出现
+    if any(count > 4 for count in counts.values()):
+        return False
+
+    def split_melds(counts: Counter) -> bool:
+        remaining = sorted(t for t, c in counts.items() if c > 0)
+        if not remaining:
+            return True
+        # 按万条筒、从小到大找第一张牌，它只能做刻子或顺子的第一张
+        first = min(remaining, key=lambda t: (TILE_SUITS.index(t[-1]), t[0]))
+        if counts[first] >= 3:
+            counts[first] -= 3
+            if split_melds(counts):
+                counts[first] += 3
+                return True
+            counts[first] += 3
+        value, suit = int(first[0]), first[-1]
+        if value <= 7:
+            second, third = f"{value + 1}{suit}", f"{value + 2}{suit}"
+            if counts[second] > 0 and counts[third] > 0:
+                for t in (first, second, third):
+                    counts[t] -= 1
+                result = split_melds(counts)
+                for t in (first, second, third):
+                    counts[t] += 1
+                if result:
+                    return True
+        return False
+
+    for pair in list(counts):
+        if counts[pair] >= 2:
+            counts[pair] -= 2
+            if split_melds(counts):
+                return True
+            counts[pair] += 2
+    return False
+
+
+def reference_check_hu(hand: Dict[str, List], tile: str) -> Tuple[bool, List[Tag]]:
+    """check_hu参考实现：按牌面字符串逐条检查大对子、单钓、七对、常规胡牌和清一色"""
+    concealed = [t for t in hand["concealed"] if isinstance(t, str) and t.strip()]
+    exposed = [t for group in hand["exposed"] if isinstance(group, dict) for t in group["tiles"][:3]]
+    tiles = concealed + exposed + [tile]
+    counts = Counter(tiles)
+
+    win_type = []
+    # 大对子：1对将牌 + 4个刻子（单钓将除外）
+    if not (len(set(exposed)) == 4 or len(concealed) == 1):
+        pairs = [t for t, c in counts.items() if c == 2]
+        if len(pairs) == 1 and all(c == 3 for t, c in counts.items() if t != pairs[0]):
+            win_type.append(Tag.DA_DUI_ZI)
+    # 单钓：4组副露 + 手里一张
+    if len(set(exposed)) == 4 and len(concealed) == 1 and concealed[0] == tile:
+        win_type.append(Tag.DAN_DIAO)
+    # 七对/龙七对
+    if not exposed and sum(c // 2 for c in counts.values()) == 7:
+        win_type.append(Tag.LONG_QI_DUI if counts[tile] == 4 else Tag.XIAO_QI_DUI)
+    # 常规胡牌
+    if not win_type and reference_is_normal_win(concealed + [tile], 4 - len(exposed) // 3):
+        win_type.append(Tag.PING_HU)
+    # 清一色
+    if win_type and len({t[-1] for t in tiles}) == 1:
+        if Tag.PING_HU in win_type:
+            win_type.remove(Tag.PING_HU)
+        win_type.append(Tag.QING_YI_SE)
+    return (False, []) if not win_type else (True, win_type)
+
+
+def reference_check_ting(hand: Dict[str, List], all_used_tiles: List[str]) -> Tuple[bool, List[Tuple[List[Tag], str, int]]]:
+    """check_ting参考实现：27种牌逐一调用check_hu参考实现"""
+    ting_tiles = []
+    for tile in TILE:
+        is_win, win_type = reference_check_hu(hand, tile)
+        if is_win:
+            ting_tiles.append((win_type, tile, 4 - all_used_tiles.count(tile)))
+    return len(ting_tiles) > 0, ting_tiles
+
+
+def reference_has_passport(hand: Dict[str, List], tags: List[Dict]) -> bool:
+    """has_passport参考实现：报叫、有杠，或听的牌中有非平胡牌型"""
+    if any(t["tag"] == Tag.BAO_JIAO for t in tags):
+        return True
+    if any(len(group["tiles"]) == 4 for group in hand["exposed"]):
+        return True
+    _, ting_tiles = reference_check_ting(hand, [])
+    # 与Rule.has_passport一致：只看第一张听的牌是否有平胡以外的牌型
+    return bool(ting_tiles) and any(t != Tag.PING_HU for t in ting_tiles[0][0])
+
+
+# ==================== 手牌生成 ====================
+
+def pure_suit_hands(size: int, suits: List[str]) -> List[Dict[str, List]]:
+    """穷举指定花色的所有size张清一色手牌（每种牌最多4张）"""
+    hands = []
+    for suit in suits:
+        for counts in product(range(5), repeat=len(TILE_VALUES)):
+            if sum(counts) == size:
+                concealed = [f"{value}{suit}" for value, count in zip(TILE_VALUES, counts) for _ in range(count)]
+                hands.append({"concealed": concealed, "exposed": []})
+    return hands
+
+
+def random_mixed_hand(rng: random.Random) -> Tuple[Dict[str, List], List[Dict]]:
+    """
+    随机生成一手13张的混合花色手牌（含0-4组碰/杠副露）和标签
+    一半手牌由面子和对子拼成，更容易出现听牌
+    """
+    wall = TILES.copy()
+    rng.shuffle(wall)
+    exposed = []
+    for _ in range(rng.choice([0, 0, 1, 1, 2, 3, 4])):
+        candidates = [t for t in set(wall) if wall.count(t) >= 3 and all(g["tiles"][0] != t for g in exposed)]
+        tile = rng.choice(sorted(candidates))
+        is_gang = wall.count(tile) == 4 and rng.random() < 0.3
+        for _ in range(4 if is_gang else 3):
+            wall.remove(tile)
+        exposed.append({"tiles": [tile] * (4 if is_gang else 3), "source": "self", "is_gang": is_gang})
+
+    size = 13 - 3 * len(exposed)
+    concealed = wall[:size]
+    if rng.random() < 0.5:
+        pool = Counter(wall)
+        concealed = []
+        suit = rng.choice(TILE_SUITS)
+        while len(concealed) < size:
+            if rng.random() < 0.3:
+                suit = rng.choice(TILE_SUITS)
+            value = rng.randint(1, 9)
+            if rng.random() < 0.5 and value <= 7:
+                group = [f"{value + i}{suit}" for i in range(3)]
+            else:
+                group = [f"{value}{suit}"] * rng.choice([2, 3])
+            if all(pool[t] >= group.count(t) for t in group):
+                for t in group:
+                    pool[t] -= 1
+                concealed.extend(group)
+        concealed = concealed[:size]
+    tags = [{"tag": Tag.BAO_JIAO, "source": "self"}] if rng.random() < 0.1 else []
+    return {"concealed": concealed, "exposed": exposed}, tags
+
+
+# ==================== 计时与对比 ====================
+
+class Benchmark:
+    """记录每个接口的调用耗时和与参考实现的不一致"""
+
+    def __init__(self, show_mismatches: int):
+        self.latencies: Dict[str, List[float]] = {}
+        self.mismatches: Dict[str, List[str]] = {}
+        self.checked: Dict[str, int] = {}
+        self.show_mismatches = show_mismatches
+
+    def timed(self, name: str, func: Callable, *args):
+        """调用接口并记录耗时"""
+        start = time.perf_counter()
+        result = func(*args)
+        self.latencies.setdefault(name, []).append(time.perf_counter() - start)
+        return result
+
+    def compare(self, name: str, result, expected, detail: str):
+        """与参考实现对比并记录不一致"""
+        self.checked[name] = self.checked.get(name, 0) + 1
+        if result != expected:
+            self.mismatches.setdefault(name, []).append(f"{detail}\n    实际: {result}\n    参考: {expected}")
+
+    def report(self):
+        """输出速度统计和不一致报告"""
+        print("\n" + "=" * 72)
+        print(f"{'接口':<28}{'调用次数':>10}{'次/秒':>12}{'p50(us)':>10}{'p99(us)':>10}")
+        for name, latencies in self.latencies.items():
+            latencies = sorted(latencies)
+            total = sum(latencies)
+            p50 = latencies[len(latencies) // 2] * 1e6
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e6
+            print(f"{name:<30}{len(latencies):>10}{len(latencies) / total:>12.0f}{p50:>10.1f}{p99:>10.1f}")
+        print("=" * 72)
+        for name, checked in self.checked.items():
+            mismatches = self.mismatches.get(name, [])
+            print(f"{'✅' if not mismatches else '❌'} {name}: 对比{checked}次，不一致{len(mismatches)}次")
+            for mismatch in mismatches[:self.show_mismatches]:
+                print(f"  {mismatch}")
+        return sum(len(m) for m in self.mismatches.values())
+
+
+def run_pure_suit(bench: Benchmark, rule: Rule, suits: List[str], sample: int, rng: random.Random, reference: bool):
+    """穷举（或抽样）清一色手牌，检查check_hu和check_ting"""
+    hands = pure_suit_hands(14, suits)
+    if sample:
+        hands = rng.sample(hands, min(sample, len(hands)))
+    print(f"清一色14张手牌: {len(hands)}手")
+    for hand in hands:
+        for tile in sorted(set(hand["concealed"])):
+            test_hand = {"concealed": hand["concealed"].copy(), "exposed": []}
+            test_hand["concealed"].remove(tile)
+            result = bench.timed("check_hu(清一色)", rule.check_hu, test_hand, tile)
+            if reference:
+                bench.compare("check_hu(清一色)", result, reference_check_hu(test_hand, tile),
+                              f"{test_hand['concealed']} + {tile}")
+
+    hands = pure_suit_hands(13, suits)
+    if sample:
+        hands = rng.sample(hands, min(sample, len(hands)))
+    print(f"清一色13张手牌: {len(hands)}手")
+    for hand in hands:
+        result = bench.timed("check_ting(清一色)", rule.check_ting, hand, [])
+        if reference:
+            bench.compare("check_ting(清一色)", result, reference_check_ting(hand, []), f"{hand['concealed']}")
+
+
+def run_mixed(bench: Benchmark, rule: Rule, count: int, rng: random.Random, reference: bool):
+    """随机混合花色手牌，检查check_hu、check_ting和has_passport"""
+    print(f"随机混合手牌: {count}手")
+    hands = [random_mixed_hand(rng) for _ in range(count)]
+    for hand, tags in hands:
+        tile = rng.choice(TILE)
+        result = bench.timed("check_hu(混合)", rule.check_hu, hand, tile)
+        if reference:
+            bench.compare("check_hu(混合)", result, reference_check_hu(hand, tile), f"{hand} + {tile}")
+
+        used = rng.sample(TILES, 30)
+        result = bench.timed("check_ting(混合)", rule.check_ting, hand, used)
+        if reference:
+            bench.compare("check_ting(混合)", result, reference_check_ting(hand, used), f"{hand}")
+
+        has_passport, _ = bench.timed("has_passport(混合)", rule.has_passport, hand, tags)
+        if reference:
+            bench.compare("has_passport(混合)", has_passport, reference_has_passport(hand, tags), f"{hand} {tags}")
+    return [hand for hand, _ in hands]
+
+
+def run_batch(bench: Benchmark, rule: Rule, hands: List[Dict[str, List]]):
+    """对比numpy批量判断与Rule.check_ting（未安装numpy时跳过）"""
+    try:
+        from source.batch_rule import batch_check_ting, flags_to_tags, hands_to_matrix
+    except ImportError:
+        print("未安装numpy，跳过批量判断对比")
+        return
+    concealed, exposed = hands_to_matrix(hands)
+    _, waits, flags = bench.timed(f"batch_check_ting(每批{len(hands)}手)", batch_check_ting, concealed, exposed)
+    for row, hand in enumerate(hands):
+        _, ting_tiles = rule.check_ting(hand, [])
+        expected = {tile: win_type for win_type, tile, _ in ting_tiles}
+        result = {TILE[index]: flags_to_tags(flags[row, index]) for index in range(len(TILE)) if waits[row, index]}
+        bench.compare("batch_check_ting", result, expected, f"{hand}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="规则引擎基准测试与差分验证")
+    parser.add_argument("--all-suits", action="store_true", help="穷举三种花色的清一色（默认只穷举万字，条/筒结果对称）")
+    parser.add_argument("--sample", type=int, default=0, help="清一色手牌随机抽样数量，0表示全部穷举")
+    parser.add_argument("--random", type=int, default=20000, help="随机混合手牌数量")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--cache", action="store_true", help="保留胡牌/听牌缓存（默认关闭，测量原始速度）")
+    parser.add_argument("--no-reference", action="store_true", help="只计时，不与参考实现对比")
+    parser.add_argument("--show", type=int, default=5, help="每个接口最多显示的不一致手牌数")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rule = Rule()
+    if not args.cache:
+        Rule.resize_cache(0)
+    bench = Benchmark(args.show)
+    reference = not args.no_reference
+
+    start = time.perf_counter()
+    run_pure_suit(bench, rule, TILE_SUITS if args.all_suits else TILE_SUITS[:1], args.sample, rng, reference)
+    mixed_hands = run_mixed(bench, rule, args.random, rng, reference)
+    run_batch(bench, rule, mixed_hands)
+    mismatches = bench.report()
+    print(f"总耗时: {time.perf_counter() - start:.1f}秒")
+    if args.cache:
+        for name, stats in Rule.get_cache_stats().items():
+            print(f"{name}缓存: 命中率{stats['hit_rate'] * 100:.1f}% 条目{stats['size']}/{stats['capacity']}")
+    raise SystemExit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
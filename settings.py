@@ -36,10 +36,13 @@ class Settings(object):
     # 游戏设置
     human_time_limit = 15  # 人类玩家思考超时时间（秒），最低0.1
     ai_time_limit = 2  # AI玩家思考时间（秒），最低0.1
+    ai_workers = 0  # 蒙特卡洛AI(AI-2)模拟用的进程数，0表示使用全部CPU核心，1表示不使用进程池
+    ismcts_node_budget = 0  # 树搜索AI(AI-3)每次决策最多扩展的节点数，0表示只受AI思考时间限制
     toast_duration = 3000  # Toast显示持续时间（毫秒）
     auto_restart_time = -1  # 超时自动再来一局的时间（秒）
     test_round = 10  # 测试轮数/自动再来一局自动点击次数
     speed_up = False  # 是否加速游戏(采集对局数据模式)，即减少思考时间/自动重开时间/toast显示时间等
+    rule_cache_size = 4096  # 胡牌/听牌判断缓存的最大条目数，0表示不缓存
     # cli_print = {'draw':True,'discard':True,'peng':True,'gang':True,'tag':True,'erro':True,'game_result':True,'game_info':True}
     cli_print = {'draw':False,'discard':False,'peng':False,'gang':False,'tag':False,'erro':True,'game_result':False,'game_info':False}
     mode_easy = [0,1,0]
@@ -0,0 +1,135 @@
+# 对局动作日志
+"""
+一局的紧凑二进制动作日志：文件头（种子、庄家、测试模式）加定长记录，每条记录6字节
+
+每条记录：动作类型、座位、牌编码（NO_TILE表示没有牌）、选项、参数
+ - DRAW/DISCARD：摸牌/出牌
+ - PENG：参数为打出这张牌的座位
+ - GANG：选项为杠牌类型（GANG_TYPES的下标）
+ - HU：每个赢家一条，选项为胡牌方式（HU_TYPES的下标），参数为牌的来源座位
+ - DECIDE：一次决策结果，选项为决策类型（DECISION_TYPES的下标），参数为AI计算用时（毫秒）
+
+发牌由种子决定，不记录；回放（source/replay.py）只需要DECIDE记录推进状态机，其他记录用于核对和分析
+"""
+import struct
+from dataclasses import dataclass
+from typing import Iterator, Optional
+from source.public import DecisionResult, DecisionType, Tag
+from source.tile import TILE, TILE_INDEX
+
+# 动作类型
+DRAW = 0
+DISCARD = 1
+PENG = 2
+GANG = 3
+HU = 4
+DECIDE = 5
+ACTION_NAMES = ("摸牌", "出牌", "碰", "杠", "胡", "决策")
+
+GANG_TYPES = ("exposed", "add", "self")  # 明杠/加杠/暗杠（Player.gang_tile的gang_type）
+HU_TYPES = (Tag.ZI_MO, Tag.ZHUO_PAO, Tag.QIANG_GANG_HU, Tag.GANG_SAHNG_KAI_HUA, Tag.ZHUO_RE_PAO)
+DECISION_TYPES = tuple(DecisionType)
+
+NO_TILE = 0xFF
+MAX_ARG = 0xFFFF
+
+MAGIC = b"MJAL"
+VERSION = 1
+HEADER = struct.Struct("<4sBBQB")  # 标识、版本、标志位、种子、庄家座位
+RECORD = struct.Struct("<BBBBH")  # 动作类型、座位、牌编码、选项、参数
+TEST_MODE_FLAG = 1
+
+
+@dataclass(frozen=True)
+class Action:
+    """解码后的一条记录"""
+    kind: int
+    seat: int
+    tile: Optional[str]
+    option: int = 0
+    arg: int = 0
+
+    def __str__(self) -> str:
+        text = f"[{self.seat}] {ACTION_NAMES[self.kind]} {self.tile or ''}"
+        if self.kind == GANG:
+            text += f" {GANG_TYPES[self.option]}"
+        elif self.kind == HU:
+            text += f" {HU_TYPES[self.option].value}（来自{self.arg}）"
+        elif self.kind == DECIDE:
+            text += f" {DECISION_TYPES[self.option].value} {self.arg}ms"
+        return text
+
+    def decision_result(self) -> DecisionResult:
+        """DECIDE记录还原为决策结果"""
+        return DecisionResult(DECISION_TYPES[self.option], True, self.tile, "回放", self.arg / 1000)
+
+
+class ActionLog:
+    """
+    一局的动作日志，记录追加在bytearray中
+
+    Args:
+        seed: 本局随机种子（GameManager.seed）
+        banker: 庄家座位
+        test_mode: 是否为测试牌局
+    """
+
+    def __init__(self, seed: int, banker: int, test_mode: bool = False):
+        self.seed = seed
+        self.banker = banker
+        self.test_mode = bool(test_mode)
+        self.data = bytearray()
+
+    def record(self, kind: int, seat: int, tile: Optional[str] = None, option: int = 0, arg: int = 0):
+        """追加一条记录"""
+        self.data += RECORD.pack(kind, seat, NO_TILE if tile is None else TILE_INDEX[tile], option, min(arg, MAX_ARG))
+
+    def record_decision(self, seat: int, result: DecisionResult):
+        """追加一次决策结果，AI计算用时按毫秒记录"""
+        self.record(DECIDE, seat, result.tile or None, DECISION_TYPES.index(result.decision_type),
+                    round(result.compute_time * 1000))
+
+    def __len__(self) -> int:
+        return len(self.data) // RECORD.size
+
+    def __getitem__(self, index: int) -> Action:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        kind, seat, tile, option, arg = RECORD.unpack_from(self.data, index * RECORD.size)
+        return Action(kind, seat, None if tile == NO_TILE else TILE[tile], option, arg)
+
+    def __iter__(self) -> Iterator[Action]:
+        for kind, seat, tile, option, arg in RECORD.iter_unpack(self.data):
+            yield Action(kind, seat, None if tile == NO_TILE else TILE[tile], option, arg)
+
+    def to_bytes(self) -> bytes:
+        """编码为文件头加记录"""
+        flags = TEST_MODE_FLAG if self.test_mode else 0
+        return HEADER.pack(MAGIC, VERSION, flags, self.seed, self.banker) + bytes(self.data)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ActionLog":
+        """从to_bytes的结果还原"""
+        if len(data) < HEADER.size:
+            raise ValueError("动作日志不完整")
+        magic, version, flags, seed, banker = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"不支持的动作日志：{magic!r} 版本{version}")
+        if (len(data) - HEADER.size) % RECORD.size:
+            raise ValueError("动作日志记录不完整")
+        log = cls(seed, banker, bool(flags & TEST_MODE_FLAG))
+        log.data = bytearray(data[HEADER.size:])
+        return log
+
+    def save(self, path: str):
+        """写入文件"""
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "ActionLog":
+        """从文件读取"""
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
@@ -0,0 +1,163 @@
+# 批量胡牌/听牌判断
+"""
+基于NumPy的批量胡牌/听牌判断，供离线分析、数据集生成和规则穷举验证使用（需要安装numpy）
+
+手牌用矩阵表示：
+    concealed: (N, 27) 隐藏手牌的计数矩阵（不含要检查的牌）
+    exposed:   (N, 27) 副露牌的计数矩阵，每组副露计前3张（与Rule.check_hu的口径一致）
+胡牌类型用 (..., len(WIN_TYPES)) 的布尔标志表示，列的顺序与WIN_TYPES一致，
+判断结果与Rule.check_hu / Rule.check_ting逐手调用完全相同
+"""
+from typing import Dict, List, Tuple
+import numpy as np
+from source.public import Tag
+from source.suit_table import DECOMPOSITION_TABLE, MAX_MELDS, SUIT_KEY_WEIGHTS, SUIT_STARTS
+from source.tile import SUIT_SIZE, TILE_KINDS, hand_to_counts
+
+# 胡牌类型标志的列顺序
+WIN_TYPES = (Tag.DA_DUI_ZI, Tag.DAN_DIAO, Tag.XIAO_QI_DUI, Tag.LONG_QI_DUI, Tag.PING_HU, Tag.QING_YI_SE)
+DA_DUI_ZI, DAN_DIAO, XIAO_QI_DUI, LONG_QI_DUI, PING_HU, QING_YI_SE = range(len(WIN_TYPES))
+
+# 分解方式位掩码：(面子数, 是否有对子) 对应第 是否有对子*5 + 面子数 位
+DECOMPOSITION_BITS = 2 * (MAX_MELDS + 1)
+
+# 查找表，第一次调用时生成
+_tables: Dict[str, np.ndarray] = {}
+
+
+def _decomposition_bit(melds: int, pair: int) -> int:
+    """(面子数, 是否有对子) 对应的位"""
+    return 1 << (pair * (MAX_MELDS + 1) + melds)
+
+
+def _get_tables() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    生成向量化查表用的两张表：
+        key_masks: 单花色编码 -> 分解方式位掩码（不能完整拆分时为0）
+        combine:   (位掩码A, 位掩码B) -> 两个花色合并后的分解方式位掩码
+    """
+    if not _tables:
+        key_masks = np.zeros(5 ** SUIT_SIZE, dtype=np.uint16)
+        for key, decompositions in DECOMPOSITION_TABLE.items():
+            mask = 0
+            for melds, has_pair in decompositions:
+                mask |= _decomposition_bit(melds, int(has_pair))
+            key_masks[key] = mask
+
+        masks = np.arange(1 << DECOMPOSITION_BITS, dtype=np.uint16)
+        left, right = masks[:, None], masks[None, :]
+        combine = np.zeros((len(masks), len(masks)), dtype=np.uint16)
+        for left_pair in range(2):
+            for right_pair in range(2 - left_pair):
+                for left_melds in range(MAX_MELDS + 1):
+                    for right_melds in range(MAX_MELDS + 1 - left_melds):
+                        left_bit = _decomposition_bit(left_melds, left_pair)
+                        right_bit = _decomposition_bit(right_melds, right_pair)
+                        both = ((left & left_bit) != 0) & ((right & right_bit) != 0)
+                        combine |= both * np.uint16(_decomposition_bit(left_melds + right_melds, left_pair + right_pair))
+        _tables["key_masks"] = key_masks
+        _tables["combine"] = combine
+    return _tables["key_masks"], _tables["combine"]
+
+
+def hands_to_matrix(hands: List[Dict[str, List]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    把dict格式的手牌列表转换为计数矩阵
+
+    Args:
+        hands: 手牌列表，每个包含"concealed"（隐藏牌）和"exposed"（副露牌）
+
+    Returns:
+        tuple: (隐藏手牌计数矩阵, 副露牌计数矩阵)，形状都是 (N, 27)
+    """
+    concealed = np.zeros((len(hands), TILE_KINDS), dtype=np.int8)
+    exposed = np.zeros((len(hands), TILE_KINDS), dtype=np.int8)
+    for row, hand in enumerate(hands):
+        counts, exposed_tiles = hand_to_counts(hand)
+        concealed[row] = counts
+        np.add.at(exposed[row], exposed_tiles, 1)
+    return concealed, exposed
+
+
+def flags_to_tags(flags: np.ndarray) -> List[Tag]:
+    """把一行胡牌类型标志转换为Tag列表（与Rule.check_hu返回的顺序一致）"""
+    return [tag for tag, flag in zip(WIN_TYPES, flags) if flag]
+
+
+def _standard_win_mask(tiles: np.ndarray, needed: np.ndarray) -> np.ndarray:
+    """
+    判断每行能否组成 needed 个面子 + 1 个对子
+    三个花色各查一次位掩码，再两次查合并表，最后检查 (needed, 有对子) 对应的位
+    """
+    key_masks, combine = _get_tables()
+    # 同一种牌超过4张时编码会进位，直接判定不能胡（查表前先截断到4张避免越界）
+    valid = (tiles.max(axis=1) <= 4) & (tiles.sum(axis=1) == needed * 3 + 2) & (needed >= 0)
+    clipped = np.minimum(tiles, 4).astype(np.int64)
+    weights = np.array(SUIT_KEY_WEIGHTS, dtype=np.int64)
+    suit_masks = [key_masks[clipped[:, start:start + SUIT_SIZE] @ weights] for start in SUIT_STARTS]
+    mask = combine[combine[suit_masks[0], suit_masks[1]], suit_masks[2]]
+    target = np.left_shift(np.uint16(1), np.clip(MAX_MELDS + 1 + needed, 0, DECOMPOSITION_BITS - 1).astype(np.uint16))
+    return valid & ((mask & target) != 0)
+
+
+def batch_check_hu(concealed: np.ndarray, exposed: np.ndarray, tiles: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批量检查胡牌，逐行结果与Rule.check_hu相同
+
+    Args:
+        concealed: (N, 27) 隐藏手牌计数矩阵（不含要检查的牌）
+        exposed: (N, 27) 副露牌计数矩阵
+        tiles: (N,) 要检查的牌的编码
+
+    Returns:
+        tuple: (胡牌掩码 (N,), 胡牌类型标志 (N, len(WIN_TYPES)))
+    """
+    concealed = np.asarray(concealed, dtype=np.int16)
+    exposed = np.asarray(exposed, dtype=np.int16)
+    tiles = np.asarray(tiles, dtype=np.int64)
+    rows = np.arange(len(concealed))
+
+    hand = concealed.copy()
+    hand[rows, tiles] += 1
+    all_tiles = hand + exposed
+    exposed_kinds = (exposed > 0).sum(axis=1)
+    has_exposed = exposed_kinds > 0
+    single_left = concealed.sum(axis=1) == 1
+    tile_count = all_tiles[rows, tiles]
+
+    flags = np.zeros((len(concealed), len(WIN_TYPES)), dtype=bool)
+    triplet_shape = ((all_tiles == 0) | (all_tiles == 2) | (all_tiles == 3)).all(axis=1)
+    flags[:, DA_DUI_ZI] = ~((exposed_kinds == 4) | single_left) & triplet_shape & ((all_tiles == 2).sum(axis=1) == 1)
+    flags[:, DAN_DIAO] = (exposed_kinds == 4) & single_left & (concealed[rows, tiles] == 1)
+    seven_pairs = ~has_exposed & ((all_tiles // 2).sum(axis=1) == 7)
+    flags[:, XIAO_QI_DUI] = seven_pairs & (tile_count != 4)
+    flags[:, LONG_QI_DUI] = seven_pairs & (tile_count == 4)
+    needed = MAX_MELDS - exposed.sum(axis=1) // 3
+    flags[:, PING_HU] = ~flags.any(axis=1) & _standard_win_mask(hand, needed)
+
+    win = flags.any(axis=1)
+    suits = np.stack([all_tiles[:, start:start + SUIT_SIZE].sum(axis=1) > 0 for start in SUIT_STARTS], axis=1)
+    pure_suit = win & (suits.sum(axis=1) == 1)
+    flags[:, QING_YI_SE] = pure_suit
+    flags[:, PING_HU] &= ~pure_suit
+    return win, flags
+
+
+def batch_check_ting(concealed: np.ndarray, exposed: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    批量检查听牌，逐行结果与Rule.check_ting相同
+
+    Args:
+        concealed: (N, 27) 隐藏手牌计数矩阵
+        exposed: (N, 27) 副露牌计数矩阵
+
+    Returns:
+        tuple: (听牌掩码 (N,), 听的牌掩码 (N, 27), 各听牌的胡牌类型标志 (N, 27, len(WIN_TYPES)))
+    """
+    concealed = np.asarray(concealed, dtype=np.int16)
+    count = len(concealed)
+    waits = np.zeros((count, TILE_KINDS), dtype=bool)
+    wait_flags = np.zeros((count, TILE_KINDS, len(WIN_TYPES)), dtype=bool)
+    for tile in range(TILE_KINDS):
+        waits[:, tile], wait_flags[:, tile] = batch_check_hu(concealed, exposed, np.full(count, tile))
+    return waits.any(axis=1), waits, wait_flags
@@ -0,0 +1,144 @@
+# 出牌候选评估
+"""
+AI出牌排序用的候选评估器
+摸牌后把手牌转换为计数向量，一次算出每种打法打出后的向听数、有效牌、听牌信息和点炮风险，
+出牌排序只需按牌查结果，不必对每张候选牌重新构造手牌、调用check_ting和重复计算点炮风险。
+build_features再把评估结果整理成按列存放的特征数组，供策略引擎按参数表整组打分
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from source.public import Tag
+from source.rule import Rule
+from source.tile import SUIT_SIZE, TILE, TILE_INDEX, hand_to_counts, tiles_to_counts
+
+# 候选牌在手牌中的组合类别（决定基本优先级）
+TRIPLET = 0  # 刻子/暗杠
+ONLY_PAIR = 1  # 唯一的对子（将牌）
+PAIR = 2  # 普通对子
+COMPOSED = 3  # 已组成的面子/搭子中的单张
+CONNECTED = 4  # 连张搭子
+GAPPED = 5  # 嵌张搭子
+ISOLATED = 6  # 孤张
+
+
+@dataclass
+class DiscardCandidate:
+    """一种打法（打出某张牌）的评估结果"""
+    tile: str  # 打出的牌
+    count: int  # 手里这张牌的张数
+    danger: float  # 点炮风险
+    shanten: Optional[int] = None  # 打出后的向听数，手牌不是14张时为None
+    effective_tiles: List[Tuple[str, int]] = field(default_factory=list)  # 有效牌及剩余张数
+    effective_total: int = 0  # 有效牌总剩余张数
+    ting_tiles: List[Tuple[List[Tag], str, int]] = field(default_factory=list)  # 打出后听的牌，格式与check_ting相同
+
+    @property
+    def can_ting(self) -> bool:
+        """打出后是否听牌"""
+        return bool(self.ting_tiles)
+
+
+def evaluate_discards(rule: Rule,
+        hand: Dict[str, List],
+        visible_tiles: List[str],
+        danger_fn: Callable[[str], float]) -> Dict[str, DiscardCandidate]:
+    """
+    评估隐藏手牌中每种牌打出后的状态
+
+    Args:
+        rule: 规则实例
+        hand: 玩家手牌，包含"concealed"（隐藏牌）和"exposed"（副露牌）
+        visible_tiles: 所有可见的牌（AI的_get_all_used_tiles），用于计算剩余张数
+        danger_fn: 点炮风险函数，每种牌只调用一次
+
+    Returns:
+        dict: 牌 -> DiscardCandidate；手牌为14张（含副露）时才计算向听数、有效牌和听牌信息
+    """
+    concealed, exposed = hand_to_counts(hand)
+    candidates = {}
+    for index, count in enumerate(concealed):
+        if count:
+            tile = TILE[index]
+            candidates[tile] = DiscardCandidate(tile=tile, count=count, danger=danger_fn(tile))
+
+    if sum(concealed) + len(exposed) != 14:
+        return candidates
+
+    visible = tiles_to_counts([tile for tile in visible_tiles if tile])
+    for discard, shanten, effective in rule._get_ukeire(concealed, exposed):
+        candidate = candidates[TILE[discard]]
+        candidate.shanten = shanten
+        candidate.effective_tiles = [(TILE[index], max(0, 4 - visible[index])) for index in effective]
+        candidate.effective_total = sum(remaining for _, remaining in candidate.effective_tiles)
+        # 打出后向听数为0的打法才可能听牌，此时再查听的牌
+        if shanten == 0:
+            concealed[discard] -= 1
+            waits = rule.get_cached_waits(concealed, exposed)
+            concealed[discard] += 1
+            candidate.ting_tiles = [(list(win_type), TILE[index], 4 - visible[index]) for index, win_type in waits]
+    return candidates
+
+
+@dataclass
+class CandidateFeatures:
+    """候选牌的特征数组：每个字段都是与tiles一一对应的列表"""
+    tiles: List[str]
+    count: List[int]  # 手里的张数
+    rank: List[int]  # 点数1-9
+    suit: List[str]  # 花色
+    category: List[int]  # 组合类别
+    in_composed: List[bool]  # 是否属于已组成的面子/搭子
+    danger: List[float]  # 点炮风险
+    shanten: List[Optional[int]]  # 打出后的向听数
+    effective_total: List[int]  # 打出后有效牌总剩余张数
+    ting_tiles: List[List[Tuple[List[Tag], str, int]]]  # 打出后听的牌
+
+
+def build_features(tiles: List[str],
+        candidates: Dict[str, DiscardCandidate],
+        concealed: List[str],
+        composed_tiles: Set[str]) -> CandidateFeatures:
+    """
+    把候选评估结果整理成特征数组
+
+    Args:
+        tiles: 候选牌（决定数组顺序）
+        candidates: evaluate_discards的返回值
+        concealed: 隐藏手牌
+        composed_tiles: 已组成的面子/搭子中的牌（decompose_hand的composed_tiles）
+
+    Returns:
+        CandidateFeatures: 特征数组
+    """
+    counts = tiles_to_counts(concealed)
+    pair_count = sum(1 for count in counts if count >= 2)
+    features = CandidateFeatures(tiles=tiles, count=[], rank=[], suit=[], category=[], in_composed=[],
+                                 danger=[], shanten=[], effective_total=[], ting_tiles=[])
+    for tile in tiles:
+        index = TILE_INDEX[tile]
+        count = counts[index]
+        rank = index % SUIT_SIZE + 1
+        in_composed = tile in composed_tiles
+        if count >= 3:
+            category = TRIPLET
+        elif count == 2:
+            category = ONLY_PAIR if pair_count == 1 else PAIR
+        elif in_composed:
+            category = COMPOSED
+        elif any(counts[index + offset] for offset in (-1, 1) if 1 <= rank + offset <= SUIT_SIZE):
+            category = CONNECTED
+        elif any(counts[index + offset] for offset in (-2, 2) if 1 <= rank + offset <= SUIT_SIZE):
+            category = GAPPED
+        else:
+            category = ISOLATED
+        candidate = candidates[tile]
+        features.count.append(count)
+        features.rank.append(rank)
+        features.suit.append(tile[-1])
+        features.category.append(category)
+        features.in_composed.append(in_composed)
+        features.danger.append(candidate.danger)
+        features.shanten.append(candidate.shanten)
+        features.effective_total.append(candidate.effective_total)
+        features.ting_tiles.append(candidate.ting_tiles)
+    return features
@@ -1,13 +1,19 @@
-import random,os,copy,time
+import random,os,time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from random import randint
 from source.player import HumanPlayer,AIPlayer,Player
 from source.rule import Rule
-from majiangAI import MajiangAI0,MajiangAI1
+from source.opponent_model import TileModel
+from source.action_log import ActionLog, DISCARD, DRAW, GANG, GANG_TYPES, HU, HU_TYPES, PENG
+from source.snapshot import GameSnapshot
+from majiangAI import MajiangAI0,MajiangAI1,MajiangAI2,MajiangAI3
 from source.tile import TILES
 from source.public import Tag, GameState,DecisionType,DecisionResult,DecisionRequest, get_resource_path
 from typing import List
 
 class GameManager:
+    AI_FRAME_WAIT = 1/60  # 超时后AI决策仍未完成时，每帧最多等待的时间（秒）
+
     def __init__(self, settings):
         """
         初始化游戏管理器
@@ -17,10 +23,16 @@ class GameManager:
         """
         self.settings = settings
         self.players = []  #所有玩家
+        self.ai_list = []  # 各版本AI实例（initialize_manager中创建）
         self.majiang_tiles = []  # 牌堆
         self.winner = []
         self.banker = None  # 庄家
+        self.seed = None  # 本局随机种子
+        self.rng = random.Random()  # 本局随机数：洗牌、选庄家和AI的随机决策都由本局种子决定
         self.rule = Rule() # 初始化规则检查器
+        self.tile_model = TileModel()  # 各玩家的牌概率模型，出牌/碰/杠/报叫时增量更新
+        self.action_log: ActionLog = None  # 本局动作日志（initialize_game中创建）
+        self.replay_decisions = None  # 回放模式：决策请求 -> 动作日志中的决策结果，不计算、不等待
         self.game_state = GameState.GAME_START# 使用枚举管理游戏状态
         self.is_game_over = False  # 是否游戏结束
         self.sound_callback = None  # 声音播放回调函数
@@ -46,6 +58,10 @@ class GameManager:
         # 决策碰/杠/胡/弃牌相关状态
         self.decision_result:DecisionResult = None  # 决策结果
         self.decision_request:DecisionRequest = None  # 决策请求
+        self.headless = False  # 无界面模式：不等待思考时间，决策在当前线程同步计算
+        self.decision_executor = ThreadPoolExecutor(max_workers=1)  # AI决策后台线程，发起决策请求时即开始计算
+        self.ai_compute_time = 0.0  # AI决策累计计算用时（秒）
+        self.ai_decision_count = 0  # AI决策次数
 
         # 玩家相关状态
         self.turn_start_time = 0  # 玩家回合开始时间        
@@ -67,8 +83,13 @@ class GameManager:
             GameState.GAME_OVER: self.game_over
         }
 
-    def initialize_manager(self):
-        """初始化游戏管理器、玩家列表"""
+    def initialize_manager(self, seed=None):
+        """
+        初始化游戏管理器、玩家列表
+
+        Args:
+            seed: 选择AI玩家名字的随机种子，为None时随机生成
+        """
         # 检查当前人类玩家名字和游戏模式是否与上次相同，如果相同则不需要重新初始化
         if self.players:  # 如果已有玩家，检查人类玩家名字和游戏模式是否相同
             # 获取当前人类玩家
@@ -126,24 +147,26 @@ class GameManager:
         available_boys = [name for name in self.settings.players_boy if name != human_name and len(name)==name_length]
         available_girls = [name for name in self.settings.players_girl if name != human_name and len(name)==name_length]
         
+        rng = random.Random(seed)  # 选择AI玩家名字的随机数
+
         # 选择AI玩家，确保男2女2配置
         # 总共有4个玩家，人类+3个AI，所以如果人类是男孩，AI需要1男2女；如果人类是女孩，AI需要2男1女
         if human_is_girl:
             # 人类是女孩，AI需要2男1女
-            selected_boys = random.sample(available_boys, 2)  # 选择2个男孩
-            selected_girls = random.sample(available_girls, 1)  # 选择1个女孩
+            selected_boys = rng.sample(available_boys, 2)  # 选择2个男孩
+            selected_girls = rng.sample(available_girls, 1)  # 选择1个女孩
         else:
             # 默认AI配置为1男2女
-            selected_boys = random.sample(available_boys, 1)
-            selected_girls = random.sample(available_girls, 2)
+            selected_boys = rng.sample(available_boys, 1)
+            selected_girls = rng.sample(available_girls, 2)
         
         # 组合AI玩家名单并随机打乱
         selected_ai_names = selected_boys + selected_girls
-        random.shuffle(selected_ai_names)
+        rng.shuffle(selected_ai_names)
         
         # 创建AI玩家/设置AI版本
         human_ai_version = int(self.settings.human_ai_version)
-        ai_list = [MajiangAI0(),MajiangAI1()]
+        ai_list = self.ai_list = [MajiangAI0(),MajiangAI1(),MajiangAI2(self.settings),MajiangAI3(self.settings)]  # 各版本AI实例，同版本的玩家共用
         human_player.simple_ai = ai_list[human_ai_version]
         human_player.ai_version = f"玩家{human_ai_version}"
         opponent_ai_version_list = self.settings.opponent_ai_version_list
@@ -222,16 +245,36 @@ class GameManager:
         self.majiang_tiles.insert(0, '9万')
         self.majiang_tiles.insert(0, '4万')
         
-        # 整理所有玩家的手牌
+        # 整理所有玩家的手牌，并按新手牌重新生成听牌状态
         for player in self.players:
             player.sort_hand()
+            player.refresh_waits()
+
+    def initialize_game(self, test_mode=False, seed=None):
+        """
+        初始化游戏:牌堆\庄家、重置玩家数据
+
+        Args:
+            test_mode: 是否使用测试牌局
+            seed: 本局随机种子，为None时随机生成；相同种子（且没有上局赢家）的发牌和庄家完全相同
+        """
 
-    def initialize_game(self, test_mode=False):
-        """初始化游戏:牌堆\庄家、重置玩家数据"""
+        # 本局随机数
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(32)
+        self.rng = random.Random(self.seed)
 
         # 初始化牌堆
         self.majiang_tiles = TILES.copy()
-        random.shuffle(self.majiang_tiles)
+        self.rng.shuffle(self.majiang_tiles)
+
+        # AI的随机决策（蒙特卡洛模拟、树搜索）也按本局种子重置
+        for ai in self.ai_list:
+            ai.new_game(self.rng.getrandbits(32))
+
+        # 有玩家使用蒙特卡洛AI时，在主线程中启动模拟进程池，不在决策线程中创建
+        monte_carlo_ai = self.ai_list[2]
+        if any(player.simple_ai is monte_carlo_ai for player in self.players):
+            monte_carlo_ai.start_workers()
 
         self.current_player_index = -1  # 当前玩家索引
         self.last_player_index = -1  # 上一个玩家索引
@@ -244,11 +287,12 @@ class GameManager:
         self.fanji_tiles = []  # 翻鸡牌
 
         # 选择庄家：上局赢家或随机选择
-        self.banker = self.players[random.randint(0, len(self.players) - 1)] if not self.winner else self.winner[0]
-        self.banker = self.banker if self.banker in self.players else self.players[random.randint(0, len(self.players) - 1)]
+        self.banker = self.players[self.rng.randint(0, len(self.players) - 1)] if not self.winner else self.winner[0]
+        self.banker = self.banker if self.banker in self.players else self.players[self.rng.randint(0, len(self.players) - 1)]
         banker_index = self.players.index(self.banker)
         ordered_players = self.players[banker_index:] + self.players[:banker_index]
         self.current_player_index = self.players.index(self.banker) # 把庄家设置为当前玩家
+        self.action_log = ActionLog(self.seed, banker_index, test_mode)
         self.cli_print(f"\n庄家: {self.banker.name}",'game_info')
         self.cli_print(f"轮次顺序: {' -> '.join([p.name for p in ordered_players])}",'game_info')
 
@@ -269,6 +313,7 @@ class GameManager:
                     tile = self.majiang_tiles.pop(0)
                     player.add_tile(tile)
             player.sort_hand()
+        self.tile_model.reset()
 
         # 测试模式开启时，初始化测试数据：麻将牌、玩家手牌（覆盖上述发牌逻辑）、弃牌区、庄家等（根据测试目的定制）
         if test_mode:
@@ -276,18 +321,26 @@ class GameManager:
         
         self.cli_print("游戏开始！",'game_info')
         # 检查玩家起手牌是否天听
-        for p in self.players:
-            hand = p.get_hand()
-            is_ting,_ = self.rule.check_ting(hand,[])
-            if is_ting:
+        for index, p in enumerate(self.players):
+            if p.is_ting():
                 p.add_tag(Tag.BAO_JIAO)
+                self.tile_model.on_declare(index)
                 self.cli_print(f"[{p.name}] 🎁报叫🎁, 米能[改叫], 米能[碰] [杠]。",'game_info')
-                self.toast_callback(f"[{p.name}] 报叫, 米能[改叫], 米能[碰] [杠]。")
+                if self.toast_callback:
+                    self.toast_callback(f"[{p.name}] 报叫, 米能[改叫], 米能[碰] [杠]。")
 
         # 更新游戏状态为游戏开始
         self.is_game_over = False
         self.game_state = GameState.GAME_START
 
+    def snapshot(self) -> GameSnapshot:
+        """保存当前牌局状态（不含AI内部状态和玩家累计统计），可用clone()廉价拷贝"""
+        return GameSnapshot.capture(self)
+
+    def restore(self, snapshot: GameSnapshot):
+        """恢复到snapshot保存时的牌局状态"""
+        snapshot.restore(self)
+
     def is_game_state(self, state: GameState):
         """检查当前游戏状态是否匹配
         
@@ -434,15 +487,14 @@ class GameManager:
             bool: 如果其他玩家可以胡牌则返回True，否则返回False
             list: 如果其他玩家可以胡牌则返回胡牌玩家索引列表，否则返回空列表
         """
-        # 检查其他玩家是否可以胡牌
+        # 检查其他玩家是否可以胡牌：查各玩家随手牌增量维护的听牌集合
         winner = []
         players = self.players
         for player in players:
             if player == current_player:
                 continue
-            can_hu,_ = self.rule.check_hu(player.hand,tile)
-            if player != current_player and can_hu:
-                pass_port,_ = self.rule.has_passport(player.hand,player.tags)
+            if player.can_hu(tile):
+                pass_port,_ = player.get_passport(self.rule)
                 if pass_port:
                     winner.append(self.players.index(player))
                 elif default_passport:  #热炮/抢杠胡等默认通行证
@@ -451,7 +503,8 @@ class GameManager:
                     str = f"[{player.name}] 米有通行证，米可以吃胡 [{tile}]({current_player.name}) ❌"
                     self.cli_print(str,'game_info')
                     if player.is_human:
-                        self.toast_callback(str)
+                        if self.toast_callback:
+                            self.toast_callback(str)
 
         return (False,[]) if not winner else (True,winner)
 
@@ -525,6 +578,7 @@ class GameManager:
 
     def get_cards_for_ai(self,player_index):
         """获取玩家当前可用的牌
+        返回的都是副本：后台线程计算决策期间，主循环继续改变手牌、弃牌和牌概率模型，不影响正在进行的计算
         
         Args:         
             current_player_index (int): 当前玩家索引
@@ -533,19 +587,30 @@ class GameManager:
             all_discards: 四家出牌堆，每家一个列表，顺序为[上家, 自己, 下家, 对家]
             all_exposed: 其他三家已副露列表，顺序为[上家, 自己, 下家, 对家]
             chicken_tiles: 鸡牌列表 
+            all_bao_jiao: 四家是否报叫，顺序同上
+            opponent_models: 四家的牌概率模型，顺序同上
         """
         players = self.players
         index = player_index
-        all_exposed = [players[(index + i-1) % 4].get_exposed_hand() for i in range(4)]
+        hand = players[index].hand
+        all_exposed = [self.copy_exposed(players[(index + i-1) % 4].get_exposed_hand()) for i in range(4)]
+        tile_model = self.tile_model.copy()
 
         cards = {
-            "hand": players[index].hand,
-            "all_discards": [players[(index + i-1) % 4].get_discard_tiles() for i in range(4)],
+            "hand": {"concealed": hand["concealed"].copy(), "exposed": all_exposed[1]},
+            "all_discards": [players[(index + i-1) % 4].get_discard_tiles().copy() for i in range(4)],
             "all_exposed": all_exposed,
-            "chicken_tiles": self.rule.get_chicken_tiles()
+            "chicken_tiles": list(self.rule.get_chicken_tiles()),
+            "all_bao_jiao": [self.had_player_BAOJIAO(players[(index + i-1) % 4]) for i in range(4)],
+            "opponent_models": [tile_model.models[(index + i-1) % 4] for i in range(4)]
         }
         return cards
 
+    @staticmethod
+    def copy_exposed(exposed:list)->list:
+        """复制副露列表（每组的牌列表也复制）"""
+        return [dict(group, tiles=group["tiles"].copy()) for group in exposed]
+
     def get_cards_for_ai0(self,player_index):
         """获取玩家当前可用的牌，需要对exposed做扁平化处理
         
@@ -658,11 +723,13 @@ class GameManager:
         if ting_info and current_player.first_discard and not current_player.has_tag(Tag.BAO_JIAO):
             # 默认能报叫则报叫
             current_player.add_tag(Tag.BAO_JIAO)
+            self.tile_model.on_declare(self.current_player_index)
             self.cli_print(f"[{current_player.name}] 🎁报叫🎁, 米能[改叫], 米能[碰] [杠]。",'game_info')
-            self.toast_callback(f"[{current_player.name}] 报叫, 米能[改叫], 米能[碰] [杠]。")
+            if self.toast_callback:
+                self.toast_callback(f"[{current_player.name}] 报叫, 米能[改叫], 米能[碰] [杠]。")
         
         # 检查玩家通行证：杠/大牌/报叫
-        has_passport, ting_str = self.rule.has_passport(current_player.hand,current_player.tags)
+        has_passport, ting_str = current_player.get_passport(self.rule)
         if ting_info and not current_player.jiaopai:
             current_player.jiaopai = True
             self.cli_print(f"[{current_player.name}] ✅ 听  牌: {ting_info}",'game_info')
@@ -705,7 +772,8 @@ class GameManager:
         if can_hu and not self.reject_hu:
             hu_player = ",".join([self.players[i].name for i in hu_index])
             self.cli_print(f"[{hu_player}] 可胡 [{tile}]，但 [{gang_type_str}] 米能抢杠❌",'game_info')
-            self.toast_callback(f"{current_player.name} 自杠，米能抢杠胡 [{tile}]")
+            if self.toast_callback:
+                self.toast_callback(f"{current_player.name} 自杠，米能抢杠胡 [{tile}]")
         
         if gang_type == "exposed" and self.check_chicken_tile(tile):
             if last_player.has_tag(Tag.CHONG_FENG_JI):
@@ -729,6 +797,8 @@ class GameManager:
             self.indicator_discard_tile = ""
         
         current_player.gang_tile(tile,source,gang_type,tag)
+        self.tile_model.on_gang(current_player_index,tile,gang_type)
+        self.action_log.record(GANG,current_player_index,tile,GANG_TYPES.index(gang_type))
         self.change_game_state(GameState.DRAW_AFTER_GANG_PHASE)
         self.draw_tile = None
         
@@ -759,11 +829,73 @@ class GameManager:
         # 否则直接发起决策请求
         else:
             self.decision_request = DecisionRequest(decision_list,player_index,tile)
+            self.start_decision(self.decision_request)
         
         self.LAST_STATE = self.game_state
         self.change_game_state(GameState.WAIT_PHASE)
         return False
 
+    def start_decision(self,decision_request:DecisionRequest):
+        """在后台开始计算决策请求，等待期间不阻塞画面
+        AI玩家计算决策结果（DecisionResult），人类玩家计算推荐决策(option, tile, reason)，每个请求只计算一次
+        
+        Args:
+            decision_request (DecisionRequest): 决策请求
+            
+        Returns:
+            Future: 后台计算任务，同时保存在decision_request.future；回放模式不计算，返回None
+        """
+        if self.replay_decisions:
+            return None
+        index = decision_request.player_index
+        player = self.players[index]
+        cards = self.get_cards_for_ai(index)
+        if player.is_human:
+            task = (player.make_decision,decision_request.decision_list,cards,decision_request.tile,
+                    self.get_remaining_tiles_count(),self.ting_info)
+        else:
+            task = (self.compute_ai_decision,player,decision_request.decision_list,decision_request.tile,cards)
+        if self.headless:
+            # 无界面模式直接计算，不使用后台线程
+            decision_request.future = Future()
+            decision_request.future.set_result(task[0](*task[1:]))
+        else:
+            decision_request.future = self.decision_executor.submit(*task)
+        return decision_request.future
+
+    def wait_decision(self,decision_request:DecisionRequest,block:bool):
+        """取出后台计算的结果
+        
+        Args:
+            decision_request (DecisionRequest): 决策请求
+            block (bool): 结果未完成时是否等待（最多等待一帧，避免空转占用计算时间）
+            
+        Returns:
+            计算结果，未完成时返回None
+        """
+        future = decision_request.future or self.start_decision(decision_request)
+        if block and not future.done():
+            wait([future],timeout=self.AI_FRAME_WAIT)
+        return future.result() if future.done() else None
+
+    @staticmethod
+    def compute_ai_decision(player:Player,decision_list:list,tile,cards)->DecisionResult:
+        """在后台线程中计算AI玩家的决策，并记录计算用时
+        
+        Args:
+            player (Player): AI玩家
+            decision_list (list): 决策类型列表
+            tile (str): 要决策操作的牌
+            cards (dict): get_cards_for_ai的返回值
+            
+        Returns:
+            DecisionResult: 决策结果
+        """
+        start = time.perf_counter()
+        result = player.make_decision(decision_list,tile,cards)
+        result.compute_time = time.perf_counter()-start
+        return result
+
     def have_decision_request(self):
         """检查是否有决策请求
         
@@ -777,7 +909,11 @@ class GameManager:
 
     def reset_decision_request(self):
         """重置决策请求
+        上一个请求还没开始的后台计算（如人类玩家已经操作后的推荐决策）直接取消，不占用决策线程；
+        已经开始的计算使用的是牌的副本，在时间预算内结束，结果不再使用
         """
+        if self.decision_request is not None and self.decision_request.future is not None:
+            self.decision_request.future.cancel()
         self.decision_request = DecisionRequest([DecisionType.default])
 
     # 处理决策结果
@@ -882,7 +1018,7 @@ class GameManager:
             self.cli_print(f"[{other_player.name}] 打出的 [{hu_tile}] 放炮！🔥",'game_info')
             for index in hu_index:
                 hu_player:Player = players[index]                    
-                _,passs_port = self.rule.has_passport(hu_player.hand,hu_player.tags)
+                _,passs_port = hu_player.get_passport(self.rule)
                 if is_the_last_discard:
                     hu_player.add_tag(Tag.HAI_DI_LAO_YUE,source=other_player.name)
                     self.cli_print(f"🎉🎉🎉{hu_player.name} 海底捞月！🎉🎉🎉",'game_info')
@@ -925,7 +1061,7 @@ class GameManager:
         elif hu_type == Tag.GANG_SAHNG_KAI_HUA:
             
             hu_player = self.get_players()[hu_index[0]]
-            hand = copy.deepcopy(hu_player.hand)
+            hand = hu_player.hand.copy()
             hand['concealed'] = hand['concealed'][:-1]
             _,win_type = self.rule.check_hu(hand,hu_tile)
             for wt in win_type:
@@ -973,6 +1109,9 @@ class GameManager:
         if hu_num==0:
             return False
 
+        for p in self.winner:
+            self.action_log.record(HU,players.index(p),hu_tile,HU_TYPES.index(hu_type),tile_source_index)
+
         # 结束游戏
         self.change_game_state(GameState.GAME_OVER)
         return True
@@ -1044,6 +1183,17 @@ class GameManager:
         for tag, count in self.hu_type.items():
             print(f"  {tag.value}: {count}局")
 
+        # 输出胡牌/听牌判断缓存统计
+        print("\n规则缓存统计:")
+        for name, stats in self.rule.get_cache_stats().items():
+            print(f"  {name}: 命中率{stats['hit_rate']*100:.1f}% 命中{stats['hits']} 未命中{stats['misses']} "
+                  f"淘汰{stats['evictions']} 条目{stats['size']}/{stats['capacity']}")
+        passport_stats = self.rule.get_passport_stats()
+        passport_cache = Player.passport_cache_stats
+        print(f"  通行证: 缓存命中{passport_cache['hits']} 未命中{passport_cache['misses']} "
+              f"实际判断{passport_stats['calls']}次 其中听牌检查{passport_stats['ting_checks']}次"
+              f"({passport_stats['ting_rate']*100:.1f}%)")
+
         print("="*60)
 
     def check_concealed_ji(self,player:Player)->tuple:
@@ -1266,7 +1416,7 @@ class GameManager:
             reason = (hu_ji_reason,gang_ji_reason,ji_reason)
             return (0,0,0),reason
 
-        jiaopai,_ =  (True,"") if player in self.winner else self.rule.check_ting(player.hand,[])
+        jiaopai = True if player in self.winner else player.is_ting()
         if not jiaopai: #如果没有叫牌，只计算包鸡
             if exposed_ji:  #如果有暴露牌或打出牌，算包鸡
                 player.add_tag(Tag.ZAO_BAO_JI)
@@ -1344,7 +1494,7 @@ class GameManager:
         
         for player in players:
             #查叫
-            jiaopai,_ =  (True,"") if player in winner else self.rule.check_ting(player.hand,[])
+            jiaopai = True if player in winner else player.is_ting()
 
             #计算各类型鸡分
             ji,reason = self.count_ji_between_players(player)
@@ -1417,9 +1567,11 @@ class GameManager:
             for p in winner:
                 for tag in p.tags:
                     if tag['tag'] in majiang_score["self_hu"].keys():
-                        self.sound_callback('action', player=p, action_type='zi_mo')
+                        if self.sound_callback:
+                            self.sound_callback('action', player=p, action_type='zi_mo')
                     if tag['tag'] in majiang_score["qiuren_hu"].keys():
-                        self.sound_callback('action', player=p, action_type='hu')                     
+                        if self.sound_callback:
+                            self.sound_callback('action', player=p, action_type='hu')                     
                     # 统计胡牌类型
                     if tag['tag'] in majiang_score["hu_type"].keys():
                         p.hu_type.setdefault(tag['tag'], 0)
@@ -1483,10 +1635,16 @@ class GameManager:
     def wait_phase(self):
 
         if self.have_decision_result():
+            self.action_log.record_decision(self.decision_player_index,self.decision_result)
             self.reset_decision_request()
             self.change_game_state(self.LAST_STATE)
             self.turn_start_time = time.time()
             return
+
+        # 回放模式：决策结果直接取自动作日志
+        if self.replay_decisions:
+            self.decision_result = self.replay_decisions(self.decision_request)
+            return
         
         index = self.decision_player_index
         decision_player: Player = self.get_players()[index]
@@ -1494,47 +1652,49 @@ class GameManager:
         decision_list = decision_request.decision_list
         time_limit = decision_player.time_limit
         time_pass = time.time()-self.turn_start_time
-        time_out = time_pass>time_limit
-        time_half_out = time_pass>(time_limit/2)
-
-        # 非人类玩家，超时执行,重置玩家计时
-        if (not decision_player.is_human) and time_out:
-            tile = self.decision_request.tile
-            cards = self.get_cards_for_ai(index)
-            self.decision_result = decision_player.make_decision(decision_list,tile,cards)
-            self.turn_start_time = time.time()
+        # 无界面模式不等待思考时间
+        time_out = self.headless or time_pass>time_limit
+        time_half_out = self.headless or time_pass>(time_limit/2)
 
-        # 人类玩家，超时执行推荐决策，重置玩家计时
-        elif time_out:
-            if DecisionType.DISCARD in decision_list:
-                option = DecisionType.DISCARD
-                tile = decision_player.recommend_tile
-                reason = decision_player.recommend_reason
-                self.decision_result = DecisionResult(option,True,tile,reason)
-            else:
-                option = decision_player.recommend_option
-                reason = decision_player.recommend_reason
-                result = True if option!=DecisionType.default else False
-                self.decision_result = DecisionResult(option,result,None,reason)
+        # 非人类玩家，后台决策完成且超时（加速模式下不等待）时执行,重置玩家计时
+        if not decision_player.is_human:
+            if not (time_out or self.settings.speed_up):
+                return
+            decision_result = self.wait_decision(decision_request,True)
+            if decision_result is None:
+                return
+            self.decision_result = decision_result
+            self.ai_compute_time += decision_result.compute_time
+            self.ai_decision_count += 1
+            self.cli_print(f"[{decision_player.name}] AI决策用时 {decision_result.compute_time:.3f} 秒",'game_info')
             self.turn_start_time = time.time()
             return
-        
-        # 人类玩家，发起决策请求
-        elif decision_player.is_human and time_half_out:
-            tile = self.decision_request.tile
-            cards = self.get_cards_for_ai(index)
-            ting_info = self.ting_info
-            remain_tiles_count = self.get_remaining_tiles_count()
-            option,tile,reason = decision_player.make_decision(decision_list,cards,tile,remain_tiles_count,ting_info)
+
+        # 人类玩家，推荐决策在发起请求时已开始后台计算，结果缓存在请求上
+        if decision_request.recommendation is None:
+            if not time_half_out:
+                return
+            recommendation = self.wait_decision(decision_request,time_out)
+            if recommendation is None:
+                return
+            # 过半时间后显示一次推荐
+            option,tile,reason = decision_request.recommendation = recommendation
             decision_player.recommend_option = option
             decision_player.recommend_tile = tile
             decision_player.recommend_reason = f'({reason})'
-            if tile:
-                self.toast_callback(f"{reason}")
-            else:
+            if self.toast_callback:
                 self.toast_callback(f"{reason}")
 
-            return
+        # 人类玩家，超时执行推荐决策，重置玩家计时
+        if time_out:
+            option,tile,reason = decision_request.recommendation
+            reason = f'({reason})'
+            if DecisionType.DISCARD in decision_list:
+                self.decision_result = DecisionResult(DecisionType.DISCARD,True,tile,reason)
+            else:
+                result = True if option!=DecisionType.default else False
+                self.decision_result = DecisionResult(option,result,None,reason)
+            self.turn_start_time = time.time()
 
     # 1.摸牌阶段：天胡/自摸/妙手回春，结束游戏，否则检查是否杠牌，再则出牌
     def draw_tile_phase(self):
@@ -1555,6 +1715,7 @@ class GameManager:
                 return
             self.cli_print(f"[{current_player.name}] 摸进 [{tile}]",'draw')
             current_player.add_tile(tile)
+            self.action_log.record(DRAW,current_player_index,tile)
             self.discard_tile = None
 
             hand = current_player.hand
@@ -1563,14 +1724,15 @@ class GameManager:
             # 报叫禁止杠牌
             if current_player.has_tag(Tag.BAO_JIAO):
                 self.cli_print(f"[{current_player.name}] 已经报叫，米能杠牌 [{tile}]。❌",'gang')
-                self.toast_callback('已经报叫，米能杠牌')
+                if self.toast_callback:
+                    self.toast_callback('已经报叫，米能杠牌')
             
             # 播放摸牌音效
             if self.sound_callback:
                 self.sound_callback('draw')
         
         # 检查是否自摸胡牌或可以自杠(牌墙是否至少有一张牌)
-        hand = copy.deepcopy(current_player.hand)
+        hand = current_player.hand.copy()
         can_gang = (self.rule.can_add_gang(hand,tile) or self.rule.can_self_gang(hand,tile)) and len(self.majiang_tiles)>0
 
         # 报叫禁止杠牌
@@ -1618,6 +1780,8 @@ class GameManager:
 
         def deal_discard_tile(discard_tile):
             current_player.discard_tile(discard_tile)
+            self.tile_model.on_discard(current_player_index,discard_tile)
+            self.action_log.record(DISCARD,current_player_index,discard_tile)
             self.discard_tile = discard_tile
             self.print_discard_tile(discard_tile)
             current_player.first_discard = False
@@ -1638,7 +1802,8 @@ class GameManager:
             
             if current_player.has_tag(Tag.BAO_JIAO) and tile!=self.draw_tile:
                 self.cli_print(f"[{current_player.name}] 已经报叫，米能[改叫]。不能出[{tile}],只能出[{self.draw_tile}]",'game_info')
-                self.toast_callback(f"[{current_player.name}] 已经报叫，米能[改叫]。不能出[{tile}],只能出[{self.draw_tile}]")
+                if self.toast_callback:
+                    self.toast_callback(f"[{current_player.name}] 已经报叫，米能[改叫]。不能出[{tile}],只能出[{self.draw_tile}]")
                 self.discard_tile = self.draw_tile
                 current_player.recommend_reason = f'( 已经报叫, 米能[改叫] )'
             return True
@@ -1734,6 +1899,8 @@ class GameManager:
 
                 current_player = self.change_current_player(index)  
                 current_player.peng_tile(discard_tile,source,tag)
+                self.tile_model.on_peng(index,discard_tile)
+                self.action_log.record(PENG,index,discard_tile,arg=current_player_index)
                 self.discard_tile = None
                 current_player.first_discard = False
                 self.indicator_discard_tile = ""
@@ -1769,7 +1936,7 @@ class GameManager:
             self.cli_print("没有可以杠的牌",'erro')
             raise ValueError("没有可以杠的牌")
 
-        hand = copy.deepcopy(current_player.hand)
+        hand = current_player.hand.copy()
 
         # 检查是否是自己摸上的牌
         is_self_draw = None
@@ -1821,11 +1988,12 @@ class GameManager:
                 return
             self.cli_print(f"[{current_player.name}] 杠上 [{tile}]",'draw')
             current_player.add_tile(tile)
+            self.action_log.record(DRAW,current_player_index,tile)
             self.draw_tile = tile
         if not tile:
             raise ValueError("杠牌后摸牌错误")
 
-        hand = copy.deepcopy(current_player.hand)
+        hand = current_player.hand.copy()
         hand['concealed'] = hand['concealed'][:-1]
         can_hu,_ = self.rule.check_hu(hand,tile)
         can_gang = (self.rule.can_add_gang(hand,tile) or self.rule.can_self_gang(hand,tile)) and len(self.majiang_tiles)>0
@@ -0,0 +1,118 @@
+# 手牌拆分
+"""
+AI使用的最优手牌拆分
+按花色把手牌转换为9格计数向量，用记忆化搜索找出面子数最多、其次搭子分最高的拆分方式，
+替代"先刻子、再顺子、再对子和搭子"的贪心拆分（贪心会把能组成更多面子的牌拆散）
+"""
+from functools import lru_cache
+from typing import Dict, List, Tuple
+from source.tile import SUIT_SIZE, TILE_SUITS
+
+# 搭子分（乘以10后的整数，避免浮点误差）：连张搭子质量最高，嵌张搭子和对子一般
+ADJACENT_TATSU_SCORE = 12
+GAP_TATSU_SCORE = 10
+PAIR_TATSU_SCORE = 10
+
+# 拆分中各组牌的名称
+MELD_NAMES = ("刻子", "顺子")
+TATSU_NAMES = ("对子", "连张搭子", "嵌张搭子")
+
+
+@lru_cache(maxsize=None)
+def best_suit_split(counts: Tuple[int, ...]) -> Tuple[int, int, Tuple[Tuple[str, Tuple[int, ...]], ...]]:
+    """
+    单花色的最优拆分：面子数最多，面子数相同时搭子分最高
+
+    Args:
+        counts: 单花色的9格计数向量
+
+    Returns:
+        tuple: (面子数, 搭子分*10, ((组名, 数字下标元组), ...))
+    """
+    rank = next((rank for rank, count in enumerate(counts) if count), None)
+    if rank is None:
+        return 0, 0, ()
+
+    best = None
+
+    def take(ranks: Tuple[int, ...], name: str, melds: int, score: int):
+        """取出一组牌后递归拆分剩余部分，保留更优的结果"""
+        nonlocal best
+        rest = list(counts)
+        for r in ranks:
+            rest[r] -= 1
+        rest_melds, rest_score, rest_groups = best_suit_split(tuple(rest))
+        candidate = (melds + rest_melds, score + rest_score, ((name, ranks),) + rest_groups if name else rest_groups)
+        if best is None or candidate[:2] > best[:2]:
+            best = candidate
+
+    count = counts[rank]
+    if count >= 3:
+        take((rank,) * 3, "刻子", 1, 0)
+    if rank + 2 < SUIT_SIZE and counts[rank + 1] and counts[rank + 2]:
+        take((rank, rank + 1, rank + 2), "顺子", 1, 0)
+    if count >= 2:
+        take((rank,) * 2, "对子", 0, PAIR_TATSU_SCORE)
+    if rank + 1 < SUIT_SIZE and counts[rank + 1]:
+        take((rank, rank + 1), "连张搭子", 0, ADJACENT_TATSU_SCORE)
+    if rank + 2 < SUIT_SIZE and counts[rank + 2]:
+        take((rank, rank + 2), "嵌张搭子", 0, GAP_TATSU_SCORE)
+    # 孤张
+    take((rank,), "", 0, 0)
+    return best
+
+
+def decompose_hand(hand: List[str]) -> Tuple[int, float, Dict[str, float], Dict[str, List[str]]]:
+    """
+    统计麻将手牌的面子数量、搭子数量和已组成的面子/搭子（最优拆分）
+    :param hand: 手牌字符串列表，如['1万','3条','4条','5条','7条','7条','9条','5筒','7筒','9筒','9筒','9筒','3万']
+    :return: 元组(面子数量, 搭子数量, 特殊牌型潜力字典, 已组成的面子/搭子字典)
+        搭子数量中对子和嵌张搭子各计1.0，连张搭子计1.2
+    """
+    # 1. 按花色（万/条/筒）统计每个数字的出现次数
+    suit_counts = {suit: [0] * SUIT_SIZE for suit in TILE_SUITS}
+    for card in hand:
+        suit_counts[card[-1]][int(card[:-1]) - 1] += 1
+
+    # 2. 各花色分别求最优拆分
+    meld_count = 0
+    tatsu_score = 0
+    composed_melds = {}
+    composed_tatsus = {}
+    composed_tiles = set()
+    for suit, counts in suit_counts.items():
+        melds, score, groups = best_suit_split(tuple(counts))
+        meld_count += melds
+        tatsu_score += score
+        for name, ranks in groups:
+            tiles = [f"{rank + 1}{suit}" for rank in ranks]
+            target = composed_melds if name in MELD_NAMES else composed_tatsus
+            target.setdefault(suit, []).append((name, tiles))
+            composed_tiles.update(tiles)
+
+    # 3. 评估特殊牌型潜力
+    pattern_potential = {
+        '七对子': 0.0,
+        '碰碰胡': 0.0,
+        '清一色': 0.0,
+        '门清': 0.0
+    }
+    # 3.1 七对子/碰碰胡潜力：有两张以上的牌的种数
+    pair_count = sum(1 for counts in suit_counts.values() for count in counts if count >= 2)
+    if pair_count >= 4:
+        pattern_potential['七对子'] = min(1.0, pair_count / 6.0)
+        pattern_potential['碰碰胡'] = min(1.0, pair_count / 5.0)
+    # 3.2 清一色潜力评估
+    max_suit_cards = max(sum(counts) for counts in suit_counts.values())
+    if max_suit_cards >= 7:
+        pattern_potential['清一色'] = min(1.0, max_suit_cards / 13.0)
+    # 3.3 门清潜力评估：假设没有副露就是门清，这里简化处理
+    pattern_potential['门清'] = 1.0
+
+    # 4. 整理已组成的面子和搭子
+    composed = {
+        "melds": composed_melds,
+        "tatsus": composed_tatsus,
+        "composed_tiles": list(composed_tiles)
+    }
+    return (meld_count, round(tatsu_score / 10, 1), pattern_potential, composed)
@@ -0,0 +1,117 @@
+# 无界面对局引擎
+"""
+不依赖pygame的对局引擎：直接推进GameManager的状态机直到一局结束
+不等待思考时间（GameManager.headless），决策在当前线程同步计算，不播放声音、不弹出提示、不打印日志，
+人类玩家座位按自己的AI推荐决策出牌，用于批量采集对局数据、比较AI版本和调参
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+from settings import Settings
+from source.game_manager import GameManager
+
+# 每局最多推进的游戏状态次数，超过说明对局卡死
+MAX_STEPS = 100000
+
+
+@dataclass
+class GameRecord:
+    """一局的结果，列表按GameManager.players的座位顺序"""
+    seed: int  # 本局随机种子（GameManager.seed）
+    winners: List[int]  # 赢家座位
+    score_deltas: List[int]  # 积分变化
+    deal_ins: List[bool]  # 是否点炮（含热炮、被抢杠）
+    gain_ji: List[int]  # 冲鸡分数
+    loss_ji: List[int]  # 包鸡分数
+    hu_types: List[List[str]] = field(default_factory=list)  # 每个座位本局的胡牌类型
+    steps: int = 0  # 推进状态机的次数
+    actions: bytes = b""  # 本局动作日志（ActionLog.to_bytes），可用source/replay回放
+    elapsed: float = 0.0  # 用时（秒）
+
+
+class HeadlessRunner:
+    """
+    无界面对局
+
+    Args:
+        settings: 游戏设置，为None时使用默认设置
+        ai_versions: 四个座位的AI版本（ai_list的下标），为None时沿用设置中的配置
+    """
+
+    def __init__(self, settings: Optional[Settings] = None, ai_versions: Optional[Sequence[int]] = None):
+        settings = settings or Settings()
+        settings.cli_print = {key: False for key in settings.cli_print}
+        self.manager = GameManager(settings)
+        self.manager.headless = True
+        self.manager.toast_callback = _ignore
+        self.manager.sound_callback = _ignore
+        self.manager.initialize_manager()
+        if ai_versions is not None:
+            self.set_ai_versions(ai_versions)
+
+    def set_ai_versions(self, ai_versions: Sequence[int]):
+        """按AI版本设置四个座位的AI"""
+        if len(ai_versions) != 4:
+            raise ValueError(f"需要4个座位的AI版本，实际为{list(ai_versions)}")
+        for seat, version in enumerate(ai_versions):
+            self.set_ai(seat, self.manager.ai_list[int(version)])
+            self.manager.players[seat].ai_version = f"AI-{version}"
+
+    def set_ai(self, seat: int, ai):
+        """设置某个座位的AI实例"""
+        self.manager.players[seat].simple_ai = ai
+
+    def play_game(self, seed: Optional[int] = None) -> GameRecord:
+        """
+        对局一次
+
+        Args:
+            seed: 本局随机种子（决定洗牌、庄家和AI的随机决策），为None时随机生成
+
+        Returns:
+            GameRecord: 本局结果
+        """
+        manager = self.manager
+        players = manager.players
+        before = [(p.score, p.win_count, p.OfferingWin_count, p.gain_ji_count, p.loss_ji_count, dict(p.hu_type))
+                  for p in players]
+        if seed is not None:
+            manager.winner = []  # 庄家由种子决定，不受上一局赢家影响
+
+        start = time.perf_counter()
+        manager.initialize_game(seed=seed)
+        steps = 0
+        while not manager.is_game_over:
+            manager.update_game_state()
+            steps += 1
+            if steps > MAX_STEPS:
+                raise RuntimeError(f"对局卡死：种子{manager.seed}，状态{manager.game_state}")
+        elapsed = time.perf_counter() - start
+
+        record = GameRecord(seed=manager.seed, winners=[players.index(p) for p in manager.winner],
+                            score_deltas=[], deal_ins=[], gain_ji=[], loss_ji=[], steps=steps,
+                            actions=manager.action_log.to_bytes(), elapsed=elapsed)
+        for p, (score, wins, deal_ins, gain_ji, loss_ji, hu_type) in zip(players, before):
+            record.score_deltas.append(p.score - score)
+            record.deal_ins.append(p.OfferingWin_count > deal_ins)
+            record.gain_ji.append(p.gain_ji_count - gain_ji)
+            record.loss_ji.append(p.loss_ji_count - loss_ji)
+            record.hu_types.append([tag.value for tag, count in p.hu_type.items() if count > hu_type.get(tag, 0)])
+        return record
+
+    def play(self, games: int, seed: Optional[int] = None) -> List[GameRecord]:
+        """
+        连续对局
+
+        Args:
+            games: 局数
+            seed: 第一局的随机种子，之后每局加1；为None时每局随机生成
+
+        Returns:
+            list: 每局的GameRecord
+        """
+        return [self.play_game(None if seed is None else seed + i) for i in range(games)]
+
+
+def _ignore(*args, **kwargs):
+    """无界面模式的声音/提示回调：什么都不做"""
@@ -0,0 +1,165 @@
+# 信息集蒙特卡洛树搜索
+"""
+确定化的信息集蒙特卡洛树搜索（ISMCTS）
+每次迭代先按可见信息随机补全对手手牌和牌墙（确定化），再沿树选择自己的动作，对手和摸牌按确定化的牌局推进。
+树中只有自己的决策节点和"摸到哪张牌"的机会节点，同一节点下自己的手牌是确定的，所以不同确定化可以共用一棵树
+"""
+import math
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+from source.monte_carlo import MY, Determinization, RolloutState, tile_connectivity
+
+# UCB探索系数
+EXPLORATION = 0.7
+
+# 自己杠牌的额外收益（杠牌本身有分）
+GANG_VALUE = 0.3
+
+# 每个决策节点最多考虑的出牌数量（根节点按传入的先验顺序，其他节点按牌的关联程度）
+MAX_ACTIONS = 6
+
+# 决策类型
+DISCARD = "discard"  # 出牌
+PENG = "peng"  # 碰或不碰
+GANG = "gang"  # 杠或不杠
+PASS = "pass"  # 不碰/不杠
+
+# 他人出牌在all_discards中的座位到确定化座位的映射（all_discards顺序为[上家, 自己, 下家, 对家]）
+DISCARDER_SEATS = {0: 2, 2: 0, 3: 1}
+
+
+class Node:
+    """搜索树节点：决策节点的子节点按动作索引，机会节点的子节点按摸到的牌索引"""
+    __slots__ = ("children", "visits", "value")
+
+    def __init__(self):
+        self.children: Dict = {}
+        self.visits = 0
+        self.value = 0.0
+
+    def mean(self) -> float:
+        """平均收益"""
+        return self.value / self.visits if self.visits else 0.0
+
+
+class Decision:
+    """
+    一次决策的搜索：根节点、决策类型和确定化所需的信息
+
+    Args:
+        state: 模拟起点（monte_carlo.build_state）
+        kind: 决策类型 DISCARD / PENG / GANG
+        tile: 碰/杠的牌编码，出牌决策时为None
+        discarder: 碰/杠别人的牌时，出牌者在确定化中的座位；自己摸牌后杠牌时为None
+        prior: 出牌决策时根节点的候选出牌顺序
+        root: 复用的根节点，为None时新建
+    """
+
+    def __init__(self, state: RolloutState, kind: str, tile: Optional[int] = None, discarder: Optional[int] = None,
+            prior: Optional[List[int]] = None, root: Optional[Node] = None):
+        self.state = state
+        self.kind = kind
+        self.tile = tile
+        self.discarder = discarder
+        self.prior = prior
+        self.root = root or Node()
+        self.reused_visits = self.root.visits  # 复用的访问次数
+        self.iterations = 0
+
+    def root_actions(self) -> List:
+        """根节点的动作"""
+        if self.kind == DISCARD:
+            return self.prior[:MAX_ACTIONS] if self.prior else _discard_actions(self.state.concealed)
+        return [self.kind, PASS]
+
+    def run(self, time_limit: float, node_budget: int, rng: random.Random):
+        """
+        迭代搜索，直到用完时间或节点预算（小于等于0表示不限制，两者不能都不限制）
+        每次迭代扩展一个新节点
+        """
+        deadline = time.time() + time_limit if time_limit > 0 else None
+        while (node_budget <= 0 or self.iterations < node_budget) and (deadline is None or time.time() < deadline):
+            self.iterate(rng)
+            self.iterations += 1
+
+    def iterate(self, rng: random.Random):
+        """一次迭代：确定化、选择/扩展、模拟、回传"""
+        game = Determinization(self.state, rng)
+        path = [self.root]
+        node = self.root
+        actions = self.root_actions()
+        bonus = 0.0
+        expanded = False
+        value = None
+        while value is None:
+            action = _select(node, actions)
+            if action not in node.children:
+                node.children[action] = Node()
+                expanded = True
+            node = node.children[action]
+            path.append(node)
+
+            # 执行动作，推进到自己的下一次决策；next_kind为DISCARD表示node就是下一个决策节点，为None表示先摸牌
+            next_kind = None
+            if action == PENG:
+                game.peng(self.tile)
+                next_kind = DISCARD
+            elif action == GANG:
+                game.gang(self.tile)
+                bonus += GANG_VALUE
+            elif action == PASS:
+                if self.discarder is None:
+                    next_kind = DISCARD  # 自己摸牌后不杠，继续出牌
+                else:
+                    game.turn = (self.discarder + 1) % 4
+                    value = game.play_opponents(rng)
+            else:
+                value = game.discard(MY, action)
+                if value is None:
+                    value = game.play_opponents(rng)
+            if value is not None:
+                break
+
+            if next_kind is None:
+                value, drawn = game.draw(MY)
+                if value is not None:
+                    break
+                # 机会节点：按摸到的牌进入自己的决策节点
+                if expanded:
+                    value = game.rollout(rng)
+                    break
+                node = node.children.setdefault(drawn, Node())
+                path.append(node)
+            if expanded:
+                value = game.rollout(rng)
+                break
+            actions = _discard_actions(game.hands[MY])
+
+        value += bonus
+        for visited in path:
+            visited.visits += 1
+            visited.value += value
+
+    def best_actions(self) -> List[Tuple]:
+        """根节点的动作按访问次数从多到少排列：[(动作, 访问次数, 平均收益), ...]"""
+        stats = [(action, child.visits, child.mean()) for action, child in self.root.children.items()]
+        stats.sort(key=lambda item: (item[1], item[2]), reverse=True)
+        return stats
+
+
+def _discard_actions(counts: List[int]) -> List[int]:
+    """非根决策节点的候选出牌：关联程度最低的几种牌"""
+    tiles = [index for index, count in enumerate(counts) if count]
+    tiles.sort(key=lambda index: tile_connectivity(counts, index))
+    return tiles[:MAX_ACTIONS]
+
+
+def _select(node: Node, actions: List):
+    """先按顺序扩展没试过的动作，都试过后按UCB1选择"""
+    for action in actions:
+        if action not in node.children:
+            return action
+    log_visits = math.log(node.visits + 1)
+    return max(actions, key=lambda action: node.children[action].mean()
+               + EXPLORATION * math.sqrt(log_visits / node.children[action].visits))
@@ -0,0 +1,356 @@
+# 蒙特卡洛出牌评估
+"""
+蒙特卡洛出牌评估
+按AI能看到的牌随机生成与之相符的对手手牌和牌墙，用快速默认策略把牌局往后模拟若干巡，
+统计每种打法的平均收益、胡牌率和点炮率。模拟只用计数向量和列表，可以直接放到进程池中运行
+"""
+import multiprocessing
+import os
+import random
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from source.public import Tag
+from source.rule import Rule
+from source.tile import SUIT_SIZE, TILE_INDEX, TILE_KINDS, hand_to_counts
+
+# 每次模拟最多进行的巡数（四家各摸打一次为一巡）
+ROLLOUT_ROUNDS = 8
+
+# 模拟结果的收益
+WIN_VALUE = 1.0  # 自己胡牌
+BIG_HAND_BONUS = 0.5  # 胡的不是平胡时额外加分
+DEAL_IN_VALUE = -1.0  # 自己点炮
+OTHER_WIN_VALUE = -0.2  # 别人自摸或别人之间点炮
+TING_VALUE = 0.3  # 模拟结束时自己听牌
+
+# 模拟结果统计的下标
+VALUE, COUNT, WINS, DEAL_INS = range(4)
+
+# 确定化牌局中自己的座位（按出牌顺序：下家、对家、上家、自己）
+MY = 3
+
+# 每个进程共用一个Rule实例（听牌结果缓存也按进程共享）
+_rule = Rule()
+
+# 进程池，由主线程调用start_executor创建
+_executor: Optional[Executor] = None
+_executor_workers = 0
+
+
+@dataclass
+class RolloutState:
+    """模拟的起点：自己摸牌后的手牌和对手的公开信息"""
+    concealed: List[int]  # 自己隐藏手牌的27格计数向量（14张，含副露）
+    exposed: List[int]  # 自己的副露牌编码列表（每组只取前3张）
+    opponent_exposed: List[List[int]]  # 对手的副露牌编码列表，按出牌顺序[下家, 对家, 上家]
+    opponent_sizes: List[int]  # 对手隐藏手牌张数，顺序同上
+    unseen: List[int]  # 自己看不到的牌的27格计数向量（对手手牌+牌墙）
+
+
+def build_state(hand: Dict[str, List], all_discards: List[List[str]], all_exposed: List[List[Dict]]) -> RolloutState:
+    """
+    按AI拿到的牌局信息生成模拟起点
+
+    Args:
+        hand: 自己手牌，包含"concealed"（隐藏牌）和"exposed"（副露牌）
+        all_discards: 四家弃牌堆，顺序为[上家, 自己, 下家, 对家]
+        all_exposed: 四家副露列表，顺序同上
+
+    Returns:
+        RolloutState: 模拟起点
+    """
+    concealed, exposed = hand_to_counts(hand)
+    visible = concealed.copy()
+    for group in hand["exposed"]:
+        for tile in group["tiles"]:
+            visible[TILE_INDEX[tile]] += 1
+    for discards in all_discards:
+        for tile in discards:
+            if tile in TILE_INDEX:
+                visible[TILE_INDEX[tile]] += 1
+
+    opponent_exposed = []
+    opponent_sizes = []
+    for seat in (2, 3, 0):  # 自己出牌后依次是下家、对家、上家
+        groups = [group["tiles"] for group in all_exposed[seat] if group["tiles"]]
+        for tiles in groups:
+            for tile in tiles:
+                visible[TILE_INDEX[tile]] += 1
+        opponent_exposed.append([TILE_INDEX[tiles[0]] for tiles in groups for _ in range(3)])
+        opponent_sizes.append(13 - 3 * len(groups))
+    unseen = [max(0, 4 - count) for count in visible]
+    return RolloutState(concealed, exposed, opponent_exposed, opponent_sizes, unseen)
+
+
+def tile_connectivity(counts: List[int], index: int) -> float:
+    """
+    一张牌与手里其他牌的关联程度，越低越适合打出
+    对子/刻子、相邻牌、隔一张的牌都算作关联，幺九牌关联稍弱
+    """
+    rank = index % SUIT_SIZE
+    score = (counts[index] - 1) * 4
+    for offset, weight in ((1, 2), (2, 1)):
+        if rank - offset >= 0:
+            score += counts[index - offset] * weight
+        if rank + offset < SUIT_SIZE:
+            score += counts[index + offset] * weight
+    if rank in (0, SUIT_SIZE - 1):
+        score -= 0.5
+    return score
+
+
+def default_discard(counts: List[int], rng: random.Random) -> int:
+    """快速默认出牌策略：打出关联程度最低的牌，同分时随机选择"""
+    best, best_score = -1, None
+    for index, count in enumerate(counts):
+        if not count:
+            continue
+        score = tile_connectivity(counts, index) + rng.random() * 0.1
+        if best_score is None or score < best_score:
+            best, best_score = index, score
+    return best
+
+
+def win_value(win_types: tuple) -> float:
+    """自己胡牌的收益，大牌额外加分"""
+    return WIN_VALUE + (BIG_HAND_BONUS if Tag.PING_HU not in win_types else 0)
+
+
+class Determinization:
+    """
+    一次确定化：按可见信息随机补全对手手牌和牌墙后的完整牌局
+    座位按出牌顺序编号：0下家、1对家、2上家、3自己（MY）；收益都从自己的角度计算，
+    出牌/摸牌等方法返回None表示牌局继续，返回数值表示牌局结束及自己的收益
+    """
+    __slots__ = ("hands", "exposed", "waits", "wall", "turn")
+
+    def __init__(self, state: RolloutState, rng: random.Random):
+        pool = [index for index, count in enumerate(state.unseen) for _ in range(count)]
+        rng.shuffle(pool)
+        self.hands = []
+        for size in state.opponent_sizes:
+            counts = [0] * TILE_KINDS
+            for index in pool[-size:]:
+                counts[index] += 1
+            del pool[-size:]
+            self.hands.append(counts)
+        self.hands.append(state.concealed.copy())
+        self.exposed = [melds.copy() for melds in state.opponent_exposed] + [state.exposed.copy()]
+        self.waits = [{} for _ in range(4)]
+        for seat in range(4):
+            self.refresh(seat)
+        self.wall = pool
+        self.turn = MY
+
+    def refresh(self, seat: int):
+        """手牌为13张（含副露）时更新听牌集合，其他张数时清空"""
+        if sum(self.hands[seat]) + len(self.exposed[seat]) == 13:
+            self.waits[seat] = dict(_rule.get_cached_waits(self.hands[seat], self.exposed[seat]))
+        else:
+            self.waits[seat] = {}
+
+    def end_value(self) -> float:
+        """牌局没有人胡牌时自己的收益"""
+        return TING_VALUE if self.waits[MY] else 0.0
+
+    def draw(self, seat: int) -> Tuple[Optional[float], Optional[int]]:
+        """
+        摸一张牌，自摸时牌局结束
+
+        Returns:
+            tuple: (牌局结束时自己的收益或None, 摸到的牌编码；牌墙摸完时为None)
+        """
+        if not self.wall:
+            return self.end_value(), None
+        tile = self.wall.pop()
+        if tile in self.waits[seat]:
+            return (win_value(self.waits[seat][tile]) if seat == MY else OTHER_WIN_VALUE), tile
+        self.hands[seat][tile] += 1
+        self.waits[seat] = {}
+        return None, tile
+
+    def discard(self, seat: int, tile: int) -> Optional[float]:
+        """出一张牌，按出牌顺序检查其他三家能否胡这张牌，没人胡时轮到下一家"""
+        self.hands[seat][tile] -= 1
+        self.refresh(seat)
+        for offset in range(1, 4):
+            other = (seat + offset) % 4
+            if tile in self.waits[other]:
+                if other == MY:
+                    return win_value(self.waits[other][tile])
+                return DEAL_IN_VALUE if seat == MY else OTHER_WIN_VALUE
+        self.turn = (seat + 1) % 4
+        return None
+
+    def peng(self, tile: int):
+        """自己碰牌：两张隐藏牌和这张牌组成副露，接下来由自己出牌"""
+        self.hands[MY][tile] -= 2
+        self.exposed[MY].extend([tile] * 3)
+        self.turn = MY
+
+    def gang(self, tile: int):
+        """自己杠牌（明杠/暗杠/加杠）：隐藏手牌中的这种牌全部并入副露，接下来由自己补牌"""
+        count = self.hands[MY][tile]
+        self.hands[MY][tile] = 0
+        if count != 1:  # 加杠时副露中已有这组牌
+            self.exposed[MY].extend([tile] * 3)
+        self.turn = MY
+
+    def play_opponents(self, rng: random.Random) -> Optional[float]:
+        """对手按默认策略依次摸牌、出牌，直到轮到自己摸牌"""
+        while self.turn != MY:
+            seat = self.turn
+            value, _ = self.draw(seat)
+            if value is not None:
+                return value
+            value = self.discard(seat, default_discard(self.hands[seat], rng))
+            if value is not None:
+                return value
+        return None
+
+    def rollout(self, rng: random.Random, rounds: int = ROLLOUT_ROUNDS) -> float:
+        """四家都按默认策略继续打最多rounds巡，返回自己的收益；自己手里多一张牌时先出牌"""
+        if self.turn == MY and sum(self.hands[MY]) + len(self.exposed[MY]) == 14:
+            value = self.discard(MY, default_discard(self.hands[MY], rng))
+            if value is not None:
+                return value
+        for _ in range(rounds * 4):
+            seat = self.turn
+            value, _ = self.draw(seat)
+            if value is not None:
+                return value
+            value = self.discard(seat, default_discard(self.hands[seat], rng))
+            if value is not None:
+                return value
+        return self.end_value()
+
+
+def rollout(state: RolloutState, discard: int, rng: random.Random) -> float:
+    """
+    打出discard后随机模拟一局的后续，返回自己的收益
+
+    Args:
+        state: 模拟起点
+        discard: 自己打出的牌编码
+        rng: 随机数生成器
+
+    Returns:
+        float: 本次模拟的收益
+    """
+    game = Determinization(state, rng)
+    value = game.discard(MY, discard)
+    return value if value is not None else game.rollout(rng)
+
+
+def run_rollouts(state: RolloutState, candidates: List[int], deadline: float, seed: int) -> Dict[int, List[float]]:
+    """
+    轮流对每个候选打法做模拟，直到时间用完
+
+    Args:
+        state: 模拟起点
+        candidates: 候选打出的牌编码列表
+        deadline: 截止时间（time.time()）
+        seed: 随机种子
+
+    Returns:
+        dict: 牌编码 -> [收益总和, 模拟次数, 胡牌次数, 点炮次数]
+    """
+    rng = random.Random(seed)
+    stats = {discard: [0.0, 0, 0, 0] for discard in candidates}
+    while time.time() < deadline:
+        for discard in candidates:
+            value = rollout(state, discard, rng)
+            record = stats[discard]
+            record[VALUE] += value
+            record[COUNT] += 1
+            record[WINS] += value >= WIN_VALUE
+            record[DEAL_INS] += value == DEAL_IN_VALUE
+    return stats
+
+
+def _warm_up() -> int:
+    """预热任务：子进程导入本模块（生成规则查表）后返回进程号"""
+    return os.getpid()
+
+
+def _mp_context():
+    """子进程启动方式：优先forkserver，不支持时用spawn；不直接fork带有界面和决策线程的主进程"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def start_executor(workers: int = 0) -> Optional[Executor]:
+    """
+    创建并预热进程池，应在主线程中调用（如开局时），不要在AI决策线程中调用
+    每个子进程先完成一次空任务，子进程的启动和模块导入不计入之后搜索的时间预算；进程数不变时复用已有的进程池
+
+    Args:
+        workers: 进程数，0表示使用全部CPU核心
+
+    Returns:
+        Executor: 进程池，进程数不超过1或无法创建进程池时返回None
+    """
+    global _executor, _executor_workers
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        return None
+    if _executor is not None and _executor_workers == workers:
+        return _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+    try:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context())
+        for future in [executor.submit(_warm_up) for _ in range(workers)]:
+            future.result()
+    except (OSError, NotImplementedError, BrokenProcessPool):
+        return None
+    _executor, _executor_workers = executor, workers
+    return _executor
+
+
+def search(state: RolloutState, candidates: List[int], time_limit: float, workers: int = 0, seed: Optional[int] = None) -> Dict[int, List[float]]:
+    """
+    在时间预算内评估候选打法，模拟分摊到进程池的各个进程
+
+    Args:
+        state: 模拟起点
+        candidates: 候选打出的牌编码列表
+        time_limit: 时间预算（秒）
+        workers: 进程数，0表示使用全部CPU核心，1表示在当前进程中模拟；
+                 进程池未启动时，主线程中调用会先启动进程池，其他线程中调用在当前进程中模拟
+        seed: 随机种子，为None时随机生成
+
+    Returns:
+        dict: 牌编码 -> [收益总和, 模拟次数, 胡牌次数, 点炮次数]
+    """
+    global _executor
+    workers = workers or os.cpu_count() or 1
+    rng = random.Random(seed)
+    seeds = [rng.getrandbits(32) for _ in range(workers)]
+    executor = _executor if workers > 1 and _executor_workers == workers else None
+    if executor is None and workers > 1 and threading.current_thread() is threading.main_thread():
+        executor = start_executor(workers)
+    # 进程池就绪后再开始计时
+    deadline = time.time() + time_limit
+    if executor is None:
+        return run_rollouts(state, candidates, deadline, seeds[0])
+
+    try:
+        futures = [executor.submit(run_rollouts, state, candidates, deadline, worker_seed) for worker_seed in seeds]
+        results = [future.result() for future in futures]
+    except BrokenProcessPool:
+        # 进程池异常退出（如子进程被杀掉），下次开局时重新创建，本次在当前进程中模拟
+        _executor = None
+        return run_rollouts(state, candidates, deadline, seeds[0])
+
+    stats = {discard: [0.0, 0, 0, 0] for discard in candidates}
+    for result in results:
+        for discard, record in result.items():
+            for field, value in enumerate(record):
+                stats[discard][field] += value
+    return stats
@@ -0,0 +1,165 @@
+# 对手牌概率模型
+"""
+按公开信息推断每个玩家手里有哪些牌、听哪些牌的概率模型
+GameManager在出牌、碰、杠、报叫时增量更新模型，AI查询时每张牌只需O(1)计算，
+所有AI共用同一份模型（模型只使用公开信息）
+"""
+from typing import List
+from source.tile import SUIT_SIZE, TILE_KINDS, TILES, tile_to_index
+
+# 没有任何信息时，一张牌成为听牌的相对可能性：中张最高，幺九最低（按数字1-9）
+RANK_WAIT_WEIGHTS = (0.6, 0.8, 1.0, 1.0, 1.0, 1.0, 1.0, 0.8, 0.6)
+
+# 听牌时某张牌是听牌的基础概率（一般听1-3种牌）
+WAIT_SHARE = 0.15
+
+# 玩家打出某张牌后，这张牌及其筋牌（相差3）作为听牌的可能性的衰减系数
+DISCARD_WAIT_DECAY = 0.2
+SUJI_WAIT_DECAY = 0.7
+
+# 玩家打出某张牌后，手里还有这张牌的可能性的衰减系数
+DISCARD_HOLD_DECAY = 0.5
+
+# 碰/杠某花色后，该花色的牌作为听牌的可能性的放大系数（可能在做清一色）
+MELD_SUIT_WAIT_BOOST = 1.2
+
+
+class OpponentModel:
+    """单个玩家的牌概率模型"""
+
+    def __init__(self, table: "TileModel"):
+        self.table = table
+        self.hold_weights = [1.0] * TILE_KINDS  # 手里有这张牌的相对可能性
+        self.wait_weights = [RANK_WAIT_WEIGHTS[index % SUIT_SIZE] for index in range(TILE_KINDS)]  # 听这张牌的相对可能性
+        self.discard_count = 0  # 打出的牌数
+        self.meld_count = 0  # 碰/杠的组数
+        self.declared = False  # 是否报叫
+
+    def copy(self, table: "TileModel") -> "OpponentModel":
+        """复制模型，副本属于table"""
+        model = OpponentModel(table)
+        model.hold_weights = self.hold_weights.copy()
+        model.wait_weights = self.wait_weights.copy()
+        model.discard_count = self.discard_count
+        model.meld_count = self.meld_count
+        model.declared = self.declared
+        return model
+
+    def on_discard(self, index: int):
+        """自己打出一张牌"""
+        self.discard_count += 1
+        self.hold_weights[index] *= DISCARD_HOLD_DECAY
+        self.wait_weights[index] *= DISCARD_WAIT_DECAY
+        rank = index % SUIT_SIZE
+        for offset in (-3, 3):
+            if 0 <= rank + offset < SUIT_SIZE:
+                self.wait_weights[index + offset] *= SUJI_WAIT_DECAY
+
+    def on_meld(self, index: int):
+        """碰/杠一组牌：手里不再有这张牌，同花色的牌更可能是听牌"""
+        self.meld_count += 1
+        self.hold_weights[index] = 0.0
+        start = index - index % SUIT_SIZE
+        for other in range(start, start + SUIT_SIZE):
+            self.wait_weights[other] *= MELD_SUIT_WAIT_BOOST
+
+    def on_pass(self, index: int):
+        """别人打出一张牌而自己没有胡：报叫后手牌固定，说明不听这张牌"""
+        if self.declared:
+            self.wait_weights[index] = 0.0
+
+    def concealed_size(self) -> int:
+        """隐藏手牌张数（不含摸牌）"""
+        return 13 - 3 * self.meld_count
+
+    def ready_probability(self) -> float:
+        """已经听牌的概率：报叫为1，否则随出牌数和副露数增加"""
+        if self.declared:
+            return 1.0
+        return min(0.9, 0.05 + 0.04 * self.discard_count + 0.15 * self.meld_count)
+
+    def hold_probability(self, tile: str, own_count: int = 0) -> float:
+        """
+        手里至少有一张这种牌的概率
+
+        Args:
+            tile: 牌
+            own_count: 查询者自己手里这种牌的张数（这些牌不可能在别人手里）
+        """
+        index = tile_to_index(tile)
+        remaining = 4 - self.table.visible[index] - own_count
+        unseen = self.table.unseen_total()
+        if remaining <= 0 or unseen <= 0:
+            return 0.0
+        miss = max(0.0, 1 - self.concealed_size() / unseen) ** remaining
+        return min(1.0, (1 - miss) * self.hold_weights[index])
+
+    def wait_probability(self, tile: str) -> float:
+        """打出这张牌会让该玩家胡牌的概率"""
+        index = tile_to_index(tile)
+        return min(1.0, self.ready_probability() * self.wait_weights[index] * WAIT_SHARE)
+
+
+class TileModel:
+    """整桌的牌概率模型：四家各一个OpponentModel，以及公开可见的各种牌的张数"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """新的一局开始时重置"""
+        self.visible = [0] * TILE_KINDS  # 弃牌和副露中可见的张数
+        self.visible_total = 0
+        self.models: List[OpponentModel] = [OpponentModel(self) for _ in range(4)]
+
+    def copy(self) -> "TileModel":
+        """复制整桌模型，供后台决策线程使用（主循环继续更新原模型）"""
+        table = TileModel.__new__(TileModel)
+        table.visible = self.visible.copy()
+        table.visible_total = self.visible_total
+        table.models = [model.copy(table) for model in self.models]
+        return table
+
+    def unseen_total(self) -> int:
+        """查询者看不到的牌数（减去查询者自己的13张手牌）"""
+        return len(TILES) - self.visible_total - 13
+
+    def _show(self, index: int, count: int):
+        """count张这种牌变为可见"""
+        self.visible[index] += count
+        self.visible_total += count
+
+    def on_discard(self, seat: int, tile: str):
+        """玩家出牌"""
+        index = tile_to_index(tile)
+        self._show(index, 1)
+        self.models[seat].on_discard(index)
+        for other, model in enumerate(self.models):
+            if other != seat:
+                model.on_pass(index)
+
+    def on_peng(self, seat: int, tile: str):
+        """玩家碰牌（被碰的牌已在出牌时计为可见）"""
+        index = tile_to_index(tile)
+        self._show(index, 2)
+        self.models[seat].on_meld(index)
+
+    def on_gang(self, seat: int, tile: str, gang_type: str):
+        """
+        玩家杠牌
+
+        Args:
+            seat: 玩家索引
+            tile: 杠的牌
+            gang_type: "exposed"（明杠，被杠的牌已计为可见）/ "self"（暗杠）/ "add"（加杠）
+        """
+        index = tile_to_index(tile)
+        self._show(index, {"exposed": 3, "self": 4, "add": 1}[gang_type])
+        if gang_type != "add":  # 加杠的那组牌碰的时候已经记过
+            self.models[seat].on_meld(index)
+        else:
+            self.models[seat].hold_weights[index] = 0.0
+
+    def on_declare(self, seat: int):
+        """玩家报叫"""
+        self.models[seat].declared = True
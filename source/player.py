@@ -2,10 +2,14 @@
 from source.tile import TILE
 from settings import Settings
 from source.public import DecisionType,DecisionResult,Tag
+from source.wait_tracker import WaitTracker
 
 class Player:
     
     """玩家基类，用于管理玩家信息"""
+
+    # 通行证缓存统计（所有玩家共用）：命中/未命中次数
+    passport_cache_stats = {"hits": 0, "misses": 0}
     
     def __init__(self, name, is_human=False, position="east"):
         """
@@ -39,6 +43,9 @@ class Player:
             'exposed': []     # 明牌（碰杠的牌）,每个元素是一个字典，包含牌组、来源、是否为杠牌、杠牌类型
         }
         self.discard_tiles = []  # 弃牌堆
+        self.wait_tracker = WaitTracker()  # 听牌状态跟踪器，随手牌变化增量更新
+        self.hand_version = 0  # 手牌/标签版本号，手牌或标签每变化一次加1
+        self.passport_cache = None  # 通行证缓存：(手牌版本号, (是否有通行证, 原因))
         
         # 标签系统，存储游戏行为产生的标签
         # 每个标签对象是一个字典，包含'tag'（标签名称）和'source'（来源）
@@ -107,8 +114,11 @@ class Player:
                     group_dict['action_type'] = 'exposed'
                     
                 self.hand['exposed'].append(group_dict)
+            self.wait_tracker.rebuild(self.hand)
         else:
             self.hand['concealed'].append(tile)
+            self.wait_tracker.add(tile)
+        self.hand_version += 1
 
     def sort_hand(self):
         """整理手牌-排序"""
@@ -122,6 +132,43 @@ class Player:
             dict: 手牌对象，包含隐藏牌和明牌
         """
         return self.hand
+
+    def refresh_waits(self):
+        """直接修改手牌（如测试数据）后，重新生成听牌状态"""
+        self.wait_tracker.rebuild(self.hand)
+        self.hand_version += 1
+
+    def get_passport(self, rule):
+        """获取玩家的通行证，手牌和标签没有变化时直接使用缓存结果
+        
+        Args:
+            rule: 规则对象
+        
+        Returns:
+            tuple: (是否有通行证, 获得原因)，同Rule.has_passport
+        """
+        if self.passport_cache and self.passport_cache[0] == self.hand_version:
+            Player.passport_cache_stats["hits"] += 1
+            return self.passport_cache[1]
+        Player.passport_cache_stats["misses"] += 1
+        result = rule.has_passport(self.hand, self.tags)
+        self.passport_cache = (self.hand_version, result)
+        return result
+
+    def can_hu(self, tile):
+        """当前手牌能否胡这张牌（查听牌集合）
+        
+        Args:
+            tile: 要检查的牌
+        
+        Returns:
+            bool: 能否胡牌
+        """
+        return self.wait_tracker.can_hu(tile)
+
+    def is_ting(self):
+        """当前手牌是否听牌"""
+        return self.wait_tracker.is_ting
     
     def hu_tile(self, tile):
         """胡牌操作
@@ -133,6 +180,8 @@ class Player:
         hand = self.hand['concealed']
         if len(hand) in [1,4,7,10,13]:
             self.hand['concealed'].append(tile)
+            self.wait_tracker.add(tile)
+            self.hand_version += 1
     
     def get_discard_tiles(self):
         """获取玩家的弃牌列表
@@ -163,6 +212,8 @@ class Player:
         # 从隐藏手牌中移除该牌
         if tile in self.hand['concealed']:
             self.hand['concealed'].remove(tile)
+            self.wait_tracker.remove(tile)
+            self.hand_version += 1
         # 添加到弃牌堆
         self.discard_tiles.append(tile)
 
@@ -197,6 +248,8 @@ class Player:
                 'action_type': 'peng',
                 'ji_tag': ji_tag
             })
+            self.wait_tracker.meld(tile, 2)
+            self.hand_version += 1
             return True
         return False
     
@@ -237,6 +290,8 @@ class Player:
                             'gang_type': 'exposed',
                             'ji_tag': ji_tag
                         })
+                        self.wait_tracker.meld(tile, 3)
+                        self.hand_version += 1
                         return True
             # 手里1张，加杠自己碰过的牌
             elif gang_type == 'add':
@@ -255,6 +310,8 @@ class Player:
                                 group['ji_tag'] = ji_tag
                                 if not tile in Settings.chicken_tile:
                                     group['source'] = "self"
+                                self.wait_tracker.remove(tile)
+                                self.hand_version += 1
                                 return True
                             else:
                                 print(f"警告: {self.name}的隐藏手牌中没有牌 {tile} 用于补杠")
@@ -283,6 +340,8 @@ class Player:
                             'gang_type': 'self',
                             'ji_tag': ji_tag
                         })
+                        self.wait_tracker.meld(tile, 4)
+                        self.hand_version += 1
                         return True
                     
         except Exception as e:
@@ -305,6 +364,7 @@ class Player:
         # 检查标签是否已存在
         if not any(t['tag'] == tag_name for t in self.tags) or tag_name == Tag.YAO_JI:
             self.tags.append(tag)
+            self.hand_version += 1
         return tag
     
     def change_tag_source(self, tag_name, new_source):
@@ -331,6 +391,7 @@ class Player:
         for tag in tags:
             if tag['tag'] == tag_name:
                 tags.remove(tag)
+                self.hand_version += 1
                 break
         self.tags = tags
 
@@ -410,7 +471,9 @@ class Player:
     def reset(self):
         """重置玩家数据"""
         self.hand = {'exposed': [], 'concealed': []}
+        self.wait_tracker.rebuild(self.hand)
         self.tags = []
+        self.hand_version += 1
         self.discard_tiles = []
         self.reject_hu = False # 拒绝胡牌标志
         self.first_discard = True # 第一次出牌标志
@@ -425,10 +488,12 @@ class Player:
         all_discards = cards["all_discards"]
         all_exposed = cards["all_exposed"]
         chicken_tiles = cards["chicken_tiles"]
+        bao_jiao = cards.get("all_bao_jiao")
+        opponent_models = cards.get("opponent_models")
         tile = None
         while not tile:
             sorted_tiles, discard_reason = self.simple_ai.get_discard_precedence_list(
-                hand, all_discards, all_exposed, chicken_tiles
+                hand, all_discards, all_exposed, chicken_tiles, bao_jiao, opponent_models
             )
             if sorted_tiles and sorted_tiles[0] in hand["concealed"]:
                 return sorted_tiles[0], discard_reason[0]
@@ -451,7 +516,7 @@ class Player:
         all_exposed = cards["all_exposed"]
         chicken_tiles = cards["chicken_tiles"]
         result, reason = self.simple_ai.decide_peng(
-            hand, all_discards, all_exposed, chicken_tiles,tile
+            hand, all_discards, all_exposed, chicken_tiles, tile, cards.get("opponent_models")
         )
         return result,reason
     
@@ -462,7 +527,7 @@ class Player:
         all_exposed = cards["all_exposed"]
         chicken_tiles = cards["chicken_tiles"]
         result, reason = self.simple_ai.decide_gang(
-            hand, all_discards, all_exposed, chicken_tiles,tile
+            hand, all_discards, all_exposed, chicken_tiles, tile, cards.get("opponent_models")
         )
         return result,reason
     
@@ -573,7 +638,6 @@ class AIPlayer(Player):
         """
         decision = None
         result = True
-        tile = None
         if DecisionType.DISCARD in decision_list:
             decision = DecisionType.DISCARD
             tile,_ = self.make_discard_decision(cards)
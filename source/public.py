@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import List
+from concurrent.futures import Future
+from typing import List, Optional
 
 
 # 胡牌类型枚举
@@ -70,6 +71,8 @@ class DecisionRequest:
     player_index: int = -1  # 要检查的玩家索引
     tile: str = ""  # 决策相关数据（如选中的牌）
     callback: callable = None  # 决策完成后的回调函数
+    future: Optional[Future] = None  # 后台计算任务：AI玩家为决策结果，人类玩家为推荐决策
+    recommendation: Optional[tuple] = None  # 人类玩家的推荐决策(option, tile, reason)，每个请求只计算一次
 
 # 决策结果（UIManager → GameManager 传递的信息）
 @dataclass
@@ -78,6 +81,7 @@ class DecisionResult:
     result: bool = False # 决策结果,False表示拒绝任何行动,True表示执行decision_type
     tile: str = ""  # 决策相关数据（如选中的牌）
     reason: str = ""  # 决策原因
+    compute_time: float = 0.0  # AI计算决策用时（秒）
 
 from pathlib import Path
 
@@ -0,0 +1,112 @@
+# 对局回放引擎
+"""
+按动作日志（source/action_log.py）重建GameManager在任意一步的状态
+按种子重新洗牌发牌，用无界面模式推进GameManager的状态机，决策结果直接取自日志中的DECIDE记录（不运行AI），
+每推进一次状态都与日志逐字节核对，不一致时抛出ValueError；重放时每隔CHECKPOINT_INTERVAL条记录保存一个快照，往回跳时从最近的快照继续
+"""
+from typing import Dict, Optional
+from settings import Settings
+from source.action_log import DECIDE, RECORD, Action, ActionLog
+from source.game_manager import GameManager
+from source.public import DecisionRequest, DecisionResult
+from source.snapshot import GameSnapshot
+
+# 推进状态机的次数上限，超过说明回放卡死
+MAX_STEPS = 100000
+
+# 每隔多少条记录保存一个快照
+CHECKPOINT_INTERVAL = 32
+
+
+class ReplayEngine:
+    """
+    对局回放
+
+    Args:
+        log: 动作日志
+        settings: 游戏设置，为None时使用默认设置
+    """
+
+    def __init__(self, log: ActionLog, settings: Optional[Settings] = None):
+        settings = settings or Settings()
+        settings.cli_print = {key: False for key in settings.cli_print}
+        self.log = log
+        self.manager = GameManager(settings)
+        self.manager.headless = True
+        self.manager.toast_callback = None
+        self.manager.sound_callback = None
+        self.manager.replay_decisions = self._next_decision
+        self.manager.initialize_manager()
+        self.checkpoints: Dict[int, GameSnapshot] = {}  # 记录数 -> 快照
+        self.reset()
+
+    @property
+    def step(self) -> int:
+        """已经重放的记录数"""
+        return len(self.manager.action_log)
+
+    def reset(self):
+        """回到发牌后的状态"""
+        manager = self.manager
+        manager.winner = [manager.players[self.log.banker]]  # 按日志指定庄家，洗牌只由种子决定
+        manager.initialize_game(self.log.test_mode, seed=self.log.seed)
+        self.checkpoints = {0: manager.snapshot()}
+
+    def seek(self, step: int) -> GameManager:
+        """
+        重建到第step条记录之后的状态，往回跳时从不超过step的最近快照继续
+        同一次状态推进产生的多条记录（如一炮多响）一起重放，实际停下的位置见self.step
+
+        Args:
+            step: 记录数，超过日志长度时重放到对局结束
+
+        Returns:
+            GameManager: 重建后的游戏管理器
+        """
+        if step < self.step:
+            self.manager.restore(self.checkpoints[max(saved for saved in self.checkpoints if saved <= step)])
+        self._advance(lambda: self.step >= step)
+        return self.manager
+
+    def run(self) -> GameManager:
+        """重放整局直到结束"""
+        self._advance(lambda: False)
+        if self.step != len(self.log):
+            raise ValueError(f"对局结束时只重放了{self.step}/{len(self.log)}条记录")
+        return self.manager
+
+    def action(self, index: int) -> Action:
+        """日志中的第index条记录"""
+        return self.log[index]
+
+    def _advance(self, done):
+        """推进状态机直到done()为真或对局结束，每次推进后核对新产生的记录"""
+        manager = self.manager
+        expected = self.log.data
+        checked = self.step
+        steps = 0
+        while not manager.is_game_over and not done():
+            manager.update_game_state()
+            data = manager.action_log.data
+            if len(data) > checked:
+                if data[checked:] != expected[checked:len(data)]:
+                    index = checked // RECORD.size
+                    raise ValueError(f"回放与日志不一致：第{index}条记录之后，日志为{self._describe(index)}")
+                checked = len(data)
+                if self.step >= max(self.checkpoints) + CHECKPOINT_INTERVAL:
+                    self.checkpoints[self.step] = manager.snapshot()
+            steps += 1
+            if steps > MAX_STEPS:
+                raise RuntimeError(f"回放卡死：第{self.step}条记录，状态{manager.game_state}")
+
+    def _describe(self, index: int) -> str:
+        """日志记录的文字描述，越界时说明日志已结束"""
+        return str(self.log[index]) if index < len(self.log) else "已结束"
+
+    def _next_decision(self, request: DecisionRequest) -> DecisionResult:
+        """回放模式的决策：决策结果会作为下一条记录写入，直接取日志中对应位置的DECIDE记录"""
+        index = self.step
+        action = self.log[index] if index < len(self.log) else None
+        if action is None or action.kind != DECIDE or action.seat != request.player_index:
+            raise ValueError(f"回放与日志不一致：第{index}条记录应为座位{request.player_index}的决策，日志为{self._describe(index)}")
+        return action.decision_result()
@@ -1,13 +1,47 @@
 from typing import List,Tuple
-from source.tile import TILE
+from source.tile import TILE, TILE_KINDS, SUIT_SIZE, hand_to_counts, tile_to_index, tiles_to_counts
+from source.suit_table import (DECOMPOSITION_TABLE, SUIT_KEY_WEIGHTS, SUIT_STARTS,
+                               MAX_MELDS, blocks_shanten, can_combine, combine_suit_blocks,
+                               get_suit_blocks, is_standard_win, merge_suit_blocks, suit_key)
+from source.rule_cache import LRUCache, hand_fingerprint
 from settings import Settings
 from source.public import Tag
-import copy
 from typing import Dict
 
 class Rule:
+    # 胡牌/听牌判断结果缓存，所有Rule实例共享（GameManager和各AI检查的是同一批手牌）
+    hu_cache = LRUCache(Settings.rule_cache_size)
+    ting_cache = LRUCache(Settings.rule_cache_size)
+    # 通行证判断统计：总调用次数、进入听牌检查分支的次数
+    passport_stats = {"calls": 0, "ting_checks": 0}
+
     def __init__(self):
         self.settings = Settings()
+
+    @classmethod
+    def resize_cache(cls, capacity: int):
+        """调整胡牌/听牌判断缓存的容量"""
+        cls.hu_cache.resize(capacity)
+        cls.ting_cache.resize(capacity)
+
+    @classmethod
+    def get_cache_stats(cls) -> Dict[str, Dict[str, float]]:
+        """获取胡牌/听牌判断缓存的统计数据（命中、未命中、淘汰次数和命中率）"""
+        return {
+            "check_hu": cls.hu_cache.stats(),
+            "check_ting": cls.ting_cache.stats(),
+        }
+
+    @classmethod
+    def get_passport_stats(cls) -> Dict[str, float]:
+        """获取通行证判断的统计数据：总调用次数、听牌检查次数及其占比"""
+        calls = cls.passport_stats["calls"]
+        ting_checks = cls.passport_stats["ting_checks"]
+        return {
+            "calls": calls,
+            "ting_checks": ting_checks,
+            "ting_rate": ting_checks / calls if calls else 0.0,
+        }
  
     def can_peng(self, hand, tile: str):
         """
@@ -93,6 +127,8 @@ class Rule:
                 return "，".join(ting_info)
 
 
+        self.passport_stats["calls"] += 1
+
         # 1.报叫
         if any(t['tag'] == Tag.BAO_JIAO for t in tags):
             return True, "报叫"
@@ -107,6 +143,7 @@ class Rule:
             return True, "，".join(gang_reasons)
 
         # 3. 听牌且听的牌型不是小平胡，细化胡牌类型
+        self.passport_stats["ting_checks"] += 1
         is_ting, ting_info = self.check_ting(hand, [])
         if is_ting:
             ting_str = handle_ting_info(ting_info)
@@ -126,176 +163,157 @@ class Rule:
         6. 清一色：所有牌属于同一种花色
         返回：胡牌类型字符串或False
         """
-
-        # 检查清一色
-        def is_pure_suit(concealed: List[str],exposed: List[str],tile: str) -> bool:
-            tiles = concealed.copy() + exposed.copy()
-            tiles.append(tile)
-            suit = tiles[0][-1]  # 获取第一张牌的花色
-            return all(tile[-1] == suit for tile in tiles)
-
-        # 检查大对子
-        def is_big_pairs(concealed: List[str],exposed: List[str],tile: str) -> bool:
-            
-            #单钓将
-            if len(set(exposed)) == 4 or len(concealed) == 1:
-                return False
-
-            tiles = concealed.copy() + exposed.copy()
-            tiles.append(tile)
-            pairs = [tile for tile in set(tiles) if tiles.count(tile) == 2]
-            if len(pairs) != 1:
-                return False
-            test_concealed = tiles.copy()
-            test_concealed.remove(pairs[0])
-            test_concealed.remove(pairs[0])
-            return all(test_concealed.count(tile) == 3 for tile in set(test_concealed))
-
-        #单钓：1 对将牌 + 4 个暴露刻子
-        def is_single_tile(concealed: List[str],exposed: List[str],tile: str) -> bool:
-            
-            if len(set(exposed)) != 4 or len(concealed) != 1:
-                return False
-            if concealed[0] == tile:
-                return True
-            return False
-
-        # 检查小七对
-        def is_seven_pairs(concealed: List[str],exposed: List[str],tile: str) -> bool:
-            tiles = concealed.copy() + exposed.copy()
-            if exposed:
-                return False
-            tiles.append(tile)
-            tile_counts = {tile: tiles.count(tile) for tile in set(tiles)}
-            # 统计对子的数量
-            pairs = sum(count // 2 for count in tile_counts.values())
-            # 把出现四张的牌提出来组成列表
-            four_tiles = [t for t, c in tile_counts.items() if c == 4]
-            return pairs == 7 and tile not in four_tiles
-
-        # 检查龙七对
-        def is_dragon_seven_pairs(concealed: List[str],exposed: List[str],tile: str) -> bool:
-            concealed = concealed.copy()
-            exposed = exposed.copy()
-            if exposed:
-                return False
-            tiles = concealed.copy() + exposed.copy()
-            tiles.append(tile)
-            tile_counts = {tile: tiles.count(tile) for tile in set(tiles)}
-            # 统计对子的数量
-            pairs = sum(count // 2 for count in tile_counts.values())
-            # 把出现四张的牌提出来组成列表
-            four_tiles = [t for t, c in tile_counts.items() if c == 4]
-            return pairs == 7 and tile in four_tiles
-
-        # 检查常规胡牌
-        def is_normal_win(concealed: List[str],exposed: List[str],tile: str) -> bool:
-            """
-            判断是否普通胡牌（4个面子 + 1个对子）
-            前提：
-            - concealed: 隐藏手牌已排序（同花色从小到大）
-            - exposed: 明牌已排序（同花色从小到大）
-            """
-            tiles = concealed.copy()
-            exposed = exposed.copy()
-            tiles.append(tile)
-            # print(f"is_normal_win:牌型为{tiles}，明牌为{exposed}")
-            # 1. 计算已副露的面子数
-            exposed_count = len(exposed) // 3
-            if exposed_count > 4:
-                return False
-            needed = 4 - exposed_count  # 手牌需组成的面子数
-            if len(tiles) != needed * 3 + 2:
-                return False
-
-            from collections import Counter
-            cnt = Counter(tiles)
-            # 2. 枚举将牌（对子）
-            for p in cnt:
-                if cnt[p] < 2:
-                    continue
-
-                # 移除将牌
-                concealed = cnt.copy()
-                concealed[p] -= 2
-                if concealed[p] == 0:
-                    del concealed[p]
-
-                n = needed  # 需要组成 n 个面子
-
-                # 3. 贪心：先处理刻子（修复：使用 list(concealed.keys()) 避免迭代时修改）
-                for t in list(concealed.keys()):  # ← 修复：转为列表，避免运行时修改问题
-                    while concealed[t] >= 3:
-                        n -= 1
-                        concealed[t] -= 3
-                        if concealed[t] == 0:
-                            del concealed[t]
-                        if n <= 0:
-                            break  # 提前退出
-
-                if n <= 0:
-                    return True
-
-                # 4. 处理顺子（只对万/条/筒）
-                # 按排序处理（已假设手牌有序，但 key 要排序）
-                for t in sorted(concealed.keys()):
-                    if n <= 0:
-                        break
-                    if len(t) != 2 or not t[0].isdigit() or t[1] not in '万条筒':
-                        continue
-                    num = int(t[0])
-                    suit = t[1]
-                    if num > 7:
-                        continue
-                    a, b = f"{num+1}{suit}", f"{num+2}{suit}"
-                    while t in concealed and a in concealed and b in concealed and concealed[t] > 0 and concealed[a] > 0 and concealed[b] > 0:
-                        n -= 1
-                        if n < 0:
-                            break
-                        concealed[t] -= 1
-                        concealed[a] -= 1
-                        concealed[b] -= 1
-                        for x in [t, a, b]:
-                            if concealed[x] == 0:
-                                del concealed[x]
-
-                if n == 0:
-                    return True
-
-            return False
-
-        # 手牌和副露牌(杠牌只取前3张)
-        # 过滤隐藏手牌中的非字符串元素或无效字符串
-        concealed = [tile for tile in copy.deepcopy(hand["concealed"]) if isinstance(tile, str) and tile.strip()]
-        # 过滤副露牌中的非字典元素
-        exposed = [tile for group in hand["exposed"] if isinstance(group, dict) for i,tile in enumerate(group["tiles"]) if i<3]
-
-        # 计算总手牌数量
-        concealed_tiles = len(concealed + exposed)
-
-        # 仅允许13张牌进行胡牌检查
+        # 手牌和副露牌(杠牌只取前3张)转换为计数向量
+        concealed, exposed = hand_to_counts(hand)
+        self._check_tile_total(hand, concealed, exposed, tile)
+
+        # 按手牌指纹查缓存，未命中时计算并写入
+        key = (hand_fingerprint(concealed, exposed), tile_to_index(tile))
+        win_type = self.hu_cache.get(key)
+        if win_type is None:
+            win_type = tuple(self._get_win_types(concealed, exposed, key[1]))
+            self.hu_cache.put(key, win_type)
+        return (False, []) if not win_type else (True, list(win_type))
+
+    def _check_tile_total(self, hand, concealed: List[int], exposed: List[int], tile: str):
+        """仅允许13张牌进行胡牌检查，数量错误时抛出ValueError"""
+        concealed_tiles = sum(concealed) + len(exposed)
         if concealed_tiles != 13:
             print(f"check_hu:手牌为{concealed_tiles}张，数量错误。")
             print(f"check_hu:\n隐藏手牌为{hand['concealed']}\n副露牌为{hand['exposed']}\n需要检查的牌为{tile}")
             raise ValueError(f"check_hu:手牌为{concealed_tiles}张，数量错误。")
-        
-        # 检查所有胡牌牌型
+
+    def _get_win_types(self, concealed: List[int], exposed: List[int], tile: int) -> List[Tag]:
+        """
+        在计数向量上检查所有胡牌牌型
+        concealed: 隐藏手牌的27格计数向量（不含要检查的牌）
+        exposed: 副露牌编码列表（每组只取前3张）
+        tile: 要检查的牌的编码
+        返回：胡牌类型列表，不能胡牌时为空列表
+        """
+        tiles = concealed.copy()
+        tiles[tile] += 1
+        all_tiles = tiles.copy()
+        for t in exposed:
+            all_tiles[t] += 1
+        # 副露中不同牌的种数（4组副露即单钓将）
+        exposed_kinds = len(set(exposed))
+        single_left = sum(concealed) == 1
+
         win_type = []
-        if is_big_pairs(concealed,exposed,tile):
+        if self._is_big_pairs(all_tiles, exposed_kinds, single_left):
             win_type.append(Tag.DA_DUI_ZI)
-        if is_single_tile(concealed,exposed,tile):
+        if exposed_kinds == 4 and single_left and concealed[tile] == 1:
             win_type.append(Tag.DAN_DIAO)
-        if is_seven_pairs(concealed,exposed,tile):
-            win_type.append(Tag.XIAO_QI_DUI)   
-        if is_dragon_seven_pairs(concealed,exposed,tile):
-            win_type.append(Tag.LONG_QI_DUI)
-        if not win_type and is_normal_win(concealed,exposed,tile):
+        if not exposed:
+            # 统计对子的数量（四张相同的牌算两对）
+            pairs = sum(count // 2 for count in all_tiles)
+            if pairs == 7 and all_tiles[tile] != 4:
+                win_type.append(Tag.XIAO_QI_DUI)
+            if pairs == 7 and all_tiles[tile] == 4:
+                win_type.append(Tag.LONG_QI_DUI)
+        if not win_type and is_standard_win(tiles, 4 - len(exposed) // 3):
             win_type.append(Tag.PING_HU)
-        if win_type and is_pure_suit(concealed,exposed,tile):
+        if win_type and self._is_pure_suit(all_tiles):
             if Tag.PING_HU in win_type:
                 win_type.remove(Tag.PING_HU)
             win_type.append(Tag.QING_YI_SE)
-        return (False, []) if not win_type else (True, win_type)
+        return win_type
+
+    @staticmethod
+    def _is_pure_suit(all_tiles: List[int]) -> bool:
+        """检查清一色：所有牌属于同一种花色"""
+        suits = [sum(all_tiles[start:start + SUIT_SIZE]) > 0 for start in range(0, TILE_KINDS, SUIT_SIZE)]
+        return sum(suits) == 1
+
+    @staticmethod
+    def _is_big_pairs(all_tiles: List[int], exposed_kinds: int, single_left: bool) -> bool:
+        """检查大对子：1 对将牌 + 4 个刻子（单钓将除外）"""
+        if exposed_kinds == 4 or single_left:
+            return False
+        pairs = 0
+        for count in all_tiles:
+            if count == 2:
+                pairs += 1
+            elif count and count != 3:
+                return False
+        return pairs == 1
+
+    def _get_waits(self, concealed: List[int], exposed: List[int]) -> List[Tuple[int, List[Tag]]]:
+        """
+        听牌引擎：一次遍历找出所有能胡的牌及其胡牌类型
+        只试探与隐藏手牌同花色且相距不超过2的牌；常规胡牌复用各花色的分解结果，
+        试探某张牌时只需重新查它所在花色的表
+        concealed: 隐藏手牌的27格计数向量（不含要检查的牌）
+        exposed: 副露牌编码列表（每组只取前3张）
+        返回：[(牌编码, 胡牌类型列表), ...]，按编码从小到大排列
+        """
+        all_tiles = concealed.copy()
+        for t in exposed:
+            all_tiles[t] += 1
+        exposed_kinds = len(set(exposed))
+        single_left = sum(concealed) == 1
+        needed = 4 - len(exposed) // 3
+        suits = {start for start in SUIT_STARTS if any(all_tiles[start:start + SUIT_SIZE])}
+
+        # 大对子/七对的统计量，试探时按摸入牌增量更新
+        pairs = sum(count // 2 for count in all_tiles)
+        twos = all_tiles.count(2)
+        not_triplets = sum(1 for count in all_tiles if count not in (0, 2, 3))
+
+        # 各花色的分解结果，常规胡牌要求摸入牌所在花色以外的花色都能完整拆分
+        keys = [suit_key(concealed, start) for start in SUIT_STARTS]
+        decompositions = [DECOMPOSITION_TABLE.get(key, frozenset()) for key in keys]
+        broken = {start for start, suit_decompositions in zip(SUIT_STARTS, decompositions) if not suit_decompositions}
+
+        # 候选牌：与隐藏手牌同花色且相距不超过2
+        candidates = set()
+        for index, count in enumerate(concealed):
+            if count:
+                start = index - index % SUIT_SIZE
+                candidates.update(range(max(start, index - 2), min(start + SUIT_SIZE, index + 3)))
+
+        waits = []
+        for index in sorted(candidates):
+            start = index - index % SUIT_SIZE
+            count = all_tiles[index]
+            win_type = []
+            if not (exposed_kinds == 4 or single_left):
+                new_twos = twos - (count == 2) + (count + 1 == 2)
+                new_not_triplets = not_triplets - (count not in (0, 2, 3)) + (count + 1 not in (0, 2, 3))
+                if new_twos == 1 and new_not_triplets == 0:
+                    win_type.append(Tag.DA_DUI_ZI)
+            if exposed_kinds == 4 and single_left and concealed[index] == 1:
+                win_type.append(Tag.DAN_DIAO)
+            if not exposed and pairs + count % 2 == 7:
+                win_type.append(Tag.LONG_QI_DUI if count + 1 == 4 else Tag.XIAO_QI_DUI)
+            if not win_type and concealed[index] < 4 and not broken - {start}:
+                suit = SUIT_STARTS.index(start)
+                tried = decompositions.copy()
+                tried[suit] = DECOMPOSITION_TABLE.get(keys[suit] + SUIT_KEY_WEIGHTS[index - start], frozenset())
+                if can_combine(tried, needed):
+                    win_type.append(Tag.PING_HU)
+            if win_type and len(suits | {start}) == 1:
+                if Tag.PING_HU in win_type:
+                    win_type.remove(Tag.PING_HU)
+                win_type.append(Tag.QING_YI_SE)
+            if win_type:
+                waits.append((index, win_type))
+        return waits
+
+    def get_cached_waits(self, concealed: List[int], exposed: List[int]) -> Tuple[Tuple[int, Tuple[Tag, ...]], ...]:
+        """
+        按手牌指纹查缓存获取听牌结果，未命中时由听牌引擎一次找出所有能胡的牌
+        concealed: 隐藏手牌的27格计数向量
+        exposed: 副露牌编码列表（每组只取前3张）
+        返回：((牌编码, 胡牌类型), ...)，按编码从小到大排列
+        """
+        key = hand_fingerprint(concealed, exposed)
+        waits = self.ting_cache.get(key)
+        if waits is None:
+            waits = tuple((index, tuple(win_type)) for index, win_type in self._get_waits(concealed, exposed))
+            self.ting_cache.put(key, waits)
+        return waits
 
     def check_ting(self, hand: Dict[str, List[str]], all_used_tiles: List[str]) -> Tuple[bool, List[Tuple[str, str, int]]]:
         """
@@ -310,47 +328,169 @@ class Rule:
         if not isinstance(hand, dict) or "concealed" not in hand or "exposed" not in hand:
             print(f"check_ting:手牌格式错误，hand={hand}")
             return False, []
-            
-        concealed = hand["concealed"]
-        exposed = hand["exposed"]
-        
-        # 检查手牌数量
-        # 创建用于检查的手牌副本，避免修改原始数据
-        # 过滤隐藏手牌中的非字符串元素或无效字符串
-        test_concealed = [tile for tile in concealed.copy() if isinstance(tile, str) and tile.strip()]
-        # 过滤副露牌中的非字典元素
-        _exposed = [tile for group in hand["exposed"] if isinstance(group, dict) for i,tile in enumerate(group["tiles"]) if i<3]
-        # 计算总手牌数量
-        hand_tiles = len(test_concealed + _exposed)
-        
+
+        # 转换为计数向量（过滤无效元素，副露牌只取前3张）
+        concealed, exposed = hand_to_counts(hand)
+        hand_tiles = sum(concealed) + len(exposed)
+
         # 检查手牌数量
         if hand_tiles not in [13, 10, 7, 4, 1]:
-            if len(concealed) != 0:
+            if len(hand["concealed"]) != 0:
                 print(f"check_ting:手牌为{hand_tiles}张，数量错误.")
                 print(f"check_ting:隐藏手牌为{hand['concealed']}，副露牌为{hand['exposed']}")
                 raise ValueError(f"check_ting:手牌为{hand_tiles}张，数量错误.")
-        
-        # 检查听牌
+        self._check_tile_total(hand, concealed, exposed, TILE[0])
+
         ting_tiles = []
-        for tile in TILE:
-            if not tile:
-                print(f"check_ting:牌 {tile} 不是有效的牌面")
-                raise ValueError(f"牌 {tile} 不是有效的牌面")
-            test_hand = {}
-            import copy
-            # 使用调整后的test_concealed副本，而不是原始concealed
-            test_hand = {
-                "concealed": copy.deepcopy(test_concealed),
-                "exposed": [group for group in copy.deepcopy(hand["exposed"]) if isinstance(group, dict)]  # 过滤非字典元素
-            }
-            is_win, win_type = self.check_hu(test_hand, tile)
-            if is_win:
-                # 计算剩余牌数
-                remaining = 4 - all_used_tiles.count(tile)
-                ting_tiles.append((win_type, tile, remaining))
-            
+        for index, win_type in self.get_cached_waits(concealed, exposed):
+            tile = TILE[index]
+            # 计算剩余牌数
+            remaining = 4 - all_used_tiles.count(tile)
+            ting_tiles.append((list(win_type), tile, remaining))
+
         return len(ting_tiles) > 0, ting_tiles
 
+    def get_shanten(self, hand: Dict[str, List[str]]) -> Tuple[int, Dict[Tag, int]]:
+        """
+        计算手牌的向听数（还差几次有效换牌才能听牌），副露组计为已完成的面子
+        支持三种牌型：常规胡牌(平胡)、七对、大对子，有副露时不计算七对
+        参数:
+            hand: 玩家手牌，包含"concealed"（隐藏牌）和"exposed"（副露牌），共13张或摸牌后14张
+        返回值:
+            tuple: (最小向听数, {牌型: 向听数})，0表示听牌，-1表示已经胡牌
+        """
+        concealed, exposed = hand_to_counts(hand)
+        hand_tiles = sum(concealed) + len(exposed)
+        if hand_tiles not in (13, 14):
+            raise ValueError(f"get_shanten:手牌为{hand_tiles}张，数量错误。")
+        shanten = self._get_shanten(concealed, exposed)
+        return min(shanten.values()), shanten
+
+    def _get_shanten(self, concealed: List[int], exposed: List[int]) -> Dict[Tag, int]:
+        """
+        在计数向量上计算各牌型的向听数
+        concealed: 隐藏手牌的27格计数向量
+        exposed: 副露牌编码列表（每组只取前3张）
+        返回：{Tag.PING_HU: 常规牌型, Tag.XIAO_QI_DUI: 七对, Tag.DA_DUI_ZI: 大对子}
+        """
+        exposed_melds = len(exposed) // 3
+        suit_blocks = [get_suit_blocks(suit_key(concealed, start)) for start in SUIT_STARTS]
+        shanten = {Tag.PING_HU: merge_suit_blocks(suit_blocks, exposed_melds)}
+        if not exposed:
+            # 四张相同的牌算两对
+            shanten[Tag.XIAO_QI_DUI] = 6 - sum(count // 2 for count in concealed)
+        triplets = sum(1 for count in concealed if count >= 3)
+        pairs = sum(1 for count in concealed if count == 2)
+        shanten[Tag.DA_DUI_ZI] = self._big_pairs_shanten(triplets, pairs, exposed_melds)
+        return shanten
+
+    @staticmethod
+    def _big_pairs_shanten(triplets: int, pairs: int, exposed_melds: int) -> int:
+        """大对子向听数：只用刻子做面子、对子做将或搭子"""
+        needed = MAX_MELDS - exposed_melds
+        melds = exposed_melds + min(triplets, needed)
+        # 多出来的刻子只能当对子用
+        pairs += max(0, triplets - needed)
+        head = 1 if pairs else 0
+        return 8 - 2 * melds - min(pairs - head, MAX_MELDS - melds) - head
+
+    def get_ukeire(self, hand: Dict[str, List[str]], visible_tiles: List[str]) -> List[Tuple[str, int, List[Tuple[str, int]], int]]:
+        """
+        一次计算摸牌后每种打法的有效牌（打出后再摸到能减少向听数的牌）
+        参数:
+            hand: 玩家手牌（摸牌后14张），包含"concealed"（隐藏牌）和"exposed"（副露牌）
+            visible_tiles: 所有可见的牌（自己的手牌+四家弃牌+副露，即AI的_get_all_used_tiles），用于计算剩余张数
+        返回值:
+            list: [(打出的牌, 打出后的向听数, [(有效牌, 剩余张数), ...], 有效牌总剩余张数), ...]，
+                  按向听数从小到大、有效牌总数从多到少排列
+        """
+        concealed, exposed = hand_to_counts(hand)
+        hand_tiles = sum(concealed) + len(exposed)
+        if hand_tiles != 14:
+            raise ValueError(f"get_ukeire:手牌为{hand_tiles}张，数量错误。")
+        visible = tiles_to_counts([tile for tile in visible_tiles if tile])
+
+        result = []
+        for discard, shanten, effective in self._get_ukeire(concealed, exposed):
+            effective_tiles = [(TILE[index], max(0, 4 - visible[index])) for index in effective]
+            total = sum(remaining for _, remaining in effective_tiles)
+            result.append((TILE[discard], shanten, effective_tiles, total))
+        result.sort(key=lambda item: (item[1], -item[3]))
+        return result
+
+    def _get_ukeire(self, concealed: List[int], exposed: List[int]) -> List[Tuple[int, int, List[int]]]:
+        """
+        批量计算每种打法的向听数和有效牌
+        各花色的编码和搭子表只算一次，打出/摸入一张牌时只重新查该花色的表
+        concealed: 隐藏手牌的27格计数向量（摸牌后）
+        exposed: 副露牌编码列表（每组只取前3张）
+        返回：[(打出的牌编码, 打出后的向听数, [有效牌编码, ...]), ...]，按打出的牌编码排列
+        """
+        exposed_melds = len(exposed) // 3
+        keys = [suit_key(concealed, start) for start in SUIT_STARTS]
+        blocks = [get_suit_blocks(key) for key in keys]
+        # 七对/大对子的统计量，打出和摸入时增量更新
+        pairs = sum(count // 2 for count in concealed)
+        twos = concealed.count(2)
+        triplets = sum(1 for count in concealed if count >= 3)
+
+        def shape_shanten(ping_hu: int, pairs: int, twos: int, triplets: int) -> int:
+            """各牌型中最小的向听数"""
+            shanten = min(ping_hu, self._big_pairs_shanten(triplets, twos, exposed_melds))
+            if not exposed:
+                shanten = min(shanten, 6 - pairs)
+            return shanten
+
+        def add_tile(count: int, delta: int) -> Tuple[int, int, int]:
+            """某种牌的张数由count变为count+delta时，七对/大对子统计量的变化"""
+            new = count + delta
+            return (new // 2 - count // 2, (new == 2) - (count == 2), (new >= 3) - (count >= 3))
+
+        # 候选有效牌：与隐藏手牌同花色且相距不超过2
+        candidates = set()
+        for index, count in enumerate(concealed):
+            if count:
+                start = index - index % SUIT_SIZE
+                candidates.update(range(max(start, index - 2), min(start + SUIT_SIZE, index + 3)))
+        candidates = sorted(candidates)
+
+        result = []
+        for discard, count in enumerate(concealed):
+            if not count:
+                continue
+            suit = discard // SUIT_SIZE
+            discard_keys = keys.copy()
+            discard_keys[suit] -= SUIT_KEY_WEIGHTS[discard % SUIT_SIZE]
+            discard_blocks = blocks.copy()
+            discard_blocks[suit] = get_suit_blocks(discard_keys[suit])
+            d_pairs, d_twos, d_triplets = add_tile(count, -1)
+            concealed[discard] -= 1
+            after = (pairs + d_pairs, twos + d_twos, triplets + d_triplets)
+            shanten = shape_shanten(merge_suit_blocks(discard_blocks, exposed_melds), *after)
+
+            # 每个花色先合并另外两个花色，摸牌时只需再合并摸入牌所在的花色
+            others = []
+            for draw_suit in range(len(SUIT_STARTS)):
+                combined = {(0, exposed_melds): 0}
+                for other_suit, other_blocks in enumerate(discard_blocks):
+                    if other_suit != draw_suit:
+                        combined = combine_suit_blocks(combined, other_blocks)
+                others.append(combined)
+
+            effective = []
+            for draw in candidates:
+                if concealed[draw] >= 4:
+                    continue
+                draw_suit = draw // SUIT_SIZE
+                draw_blocks = get_suit_blocks(discard_keys[draw_suit] + SUIT_KEY_WEIGHTS[draw % SUIT_SIZE])
+                ping_hu = blocks_shanten(others[draw_suit], draw_blocks)
+                a_pairs, a_twos, a_triplets = add_tile(concealed[draw], 1)
+                if shape_shanten(ping_hu, after[0] + a_pairs, after[1] + a_twos, after[2] + a_triplets) < shanten:
+                    effective.append(draw)
+            concealed[discard] += 1
+            result.append((discard, shanten, effective))
+        return result
+
     def test_has_passport(self):
         """测试是否有通行证"""
         print("================================通行证测试开始=================================")
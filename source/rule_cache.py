@@ -0,0 +1,90 @@
+# 规则判断缓存
+"""
+胡牌/听牌判断的手牌指纹和有界LRU缓存
+同一局中相同的手牌会被反复检查（吃胡检查、AI模拟出牌、通行证、结算查叫），
+用手牌指纹做key缓存判断结果，并统计命中/未命中/淘汰次数，便于调整缓存大小
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, List, Tuple
+
+
+def hand_fingerprint(concealed: List[int], exposed: List[int]) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """计算手牌指纹：隐藏手牌的计数向量 + 排序后的副露牌编码
+
+    Args:
+        concealed: 隐藏手牌的27格计数向量
+        exposed: 副露牌编码列表（每组只取前3张）
+
+    Returns:
+        tuple: 可哈希的手牌指纹，与副露组的先后顺序无关
+    """
+    return tuple(concealed), tuple(sorted(exposed))
+
+
+class LRUCache:
+    """有界LRU缓存，超出容量时淘汰最久未使用的条目"""
+
+    def __init__(self, capacity: int):
+        """
+        初始化缓存
+
+        Args:
+            capacity: 最大条目数，0表示不缓存
+        """
+        self.capacity = max(0, int(capacity))
+        self._data: OrderedDict = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0  # 命中次数
+        self.misses = 0  # 未命中次数
+        self.evictions = 0  # 淘汰次数
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """查询缓存，命中时把条目移到最近使用的位置"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        if not self.capacity:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def resize(self, capacity: int):
+        """调整缓存容量，缩小时立即淘汰多余条目"""
+        with self._lock:
+            self.capacity = max(0, int(capacity))
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """清空缓存和统计数据"""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, float]:
+        """返回缓存统计：条目数、容量、命中、未命中、淘汰次数和命中率"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
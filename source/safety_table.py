@@ -0,0 +1,135 @@
+# 安全牌表
+"""
+AI一次决策内共用的点炮风险表
+每次决策只扫描一遍四家弃牌堆和副露，算出全部27种牌的点炮风险，出牌排序等策略直接按牌查表，
+不必对每张候选牌重新扫描弃牌堆和副露
+"""
+from typing import Dict, List, Optional
+from source.tile import SUIT_SIZE, TILE, TILE_INDEX, TILE_KINDS
+
+# 报叫的对手没打过的牌额外增加的风险（报叫后手牌固定，只等胡牌）
+BAO_JIAO_DANGER = 30
+
+# 对手牌概率模型给出的点炮概率换算为风险分的系数
+MODEL_DANGER = 60
+
+
+class SafetyTable:
+    """全部27种牌的点炮风险，分数越高越危险"""
+
+    def __init__(self,
+            concealed: List[str],
+            all_discards: List[List[str]],
+            all_exposed: List[List[Dict]],
+            total_used: int,
+            bao_jiao: Optional[List[bool]] = None,
+            models: Optional[List] = None):
+        """
+        生成风险表
+
+        Args:
+            concealed: 自己的隐藏手牌
+            all_discards: 四家弃牌堆，顺序为[上家, 自己, 下家, 对家]
+            all_exposed: 四家副露列表，顺序同上
+            total_used: 已使用的牌数（AI的_get_all_used_tiles的长度），用于判断牌局进程
+            bao_jiao: 四家是否报叫，顺序同上，为None时不考虑报叫
+            models: 四家的OpponentModel，顺序同上，为None时不使用牌概率模型
+        """
+        self.total_used = total_used
+        self.danger = self._build(concealed, all_discards, all_exposed, bao_jiao or [], models or [])
+
+    def _build(self, concealed, all_discards, all_exposed, bao_jiao, models) -> List[float]:
+        """按牌局信息一次算出全部牌的点炮风险"""
+        total_used = self.total_used
+
+        # 1. 对手弃牌：第一个打过该牌的对手，打出时间是否在最近3张内
+        seen = [False] * TILE_KINDS
+        recent = [False] * TILE_KINDS
+        for i, discards in enumerate(all_discards):
+            if i == 1:  # 跳过自己的弃牌堆
+                continue
+            latest = set(discards[-3:])
+            for tile in discards:
+                index = TILE_INDEX.get(tile)
+                if index is not None and not seen[index]:
+                    seen[index] = True
+                    recent[index] = tile in latest
+
+        if total_used < 20:  # 牌局初期
+            unseen_danger = 10
+        elif total_used < 50:  # 牌局中期
+            unseen_danger = 20
+        else:  # 牌局后期
+            unseen_danger = 40
+        danger = [-20 if recent[i] else 5 if seen[i] else unseen_danger for i in range(TILE_KINDS)]
+
+        # 2. 副露：别人碰过的牌再打就点杠，两张同花色的副露需要的牌可能点炮
+        for exposed_list in all_exposed:
+            for exposed in exposed_list:
+                tiles = exposed["tiles"]
+                if not tiles:
+                    continue
+                if len(tiles) == 3 and tiles[0] == tiles[1] == tiles[2]:
+                    if tiles[0] in TILE_INDEX:
+                        danger[TILE_INDEX[tiles[0]]] += 60
+                    continue
+                suit = tiles[0][-1]
+                nums = [int(t[:-1]) for t in tiles if t[-1] == suit]
+                if len(nums) != 2:
+                    continue
+                low, high = min(nums), max(nums)
+                base = TILE_INDEX[tiles[0]] - int(tiles[0][:-1]) + 1
+                if high - low == 1:
+                    # 连张副露，需要两边的牌
+                    for num in (low - 1, high + 1):
+                        if 1 <= num <= SUIT_SIZE:
+                            danger[base + num - 1] += 50
+                elif high - low == 2:
+                    # 嵌张副露，需要中间的牌
+                    danger[base + low] += 60
+
+        # 3. 报叫：报叫的对手没打过的牌风险更高
+        for i, declared in enumerate(bao_jiao):
+            if i == 1 or not declared:
+                continue
+            safe = {TILE_INDEX[tile] for tile in all_discards[i] if tile in TILE_INDEX}
+            for index in range(TILE_KINDS):
+                if index not in safe:
+                    danger[index] += BAO_JIAO_DANGER
+
+        # 3.1 牌概率模型：三个对手听这张牌的概率
+        for i, model in enumerate(models):
+            if i == 1:
+                continue
+            for index, tile in enumerate(TILE):
+                danger[index] += MODEL_DANGER * model.wait_probability(tile)
+
+        # 4. 牌局进程
+        if total_used > 90:  # 牌局末期
+            scale = 2.0  # 末期风险放大
+        elif total_used < 20:  # 牌局初期
+            scale = 0.3  # 初期风险大幅降低
+        elif total_used < 50:  # 牌局中期
+            scale = 0.8  # 中期风险降低
+        else:
+            scale = 1
+        hand_counts = [0] * TILE_KINDS
+        for tile in concealed:
+            if tile in TILE_INDEX:
+                hand_counts[TILE_INDEX[tile]] += 1
+        for index in range(TILE_KINDS):
+            score = danger[index] * scale
+            # 5. 幺九牌风险稍低
+            if index % SUIT_SIZE in (0, SUIT_SIZE - 1):
+                score *= 0.7
+            # 6. 手里有刻子，打出单张风险较低；手里有对子，打出单张风险更高
+            if hand_counts[index] >= 3:
+                score *= 0.5
+            elif hand_counts[index] == 2:
+                score *= 1.3
+            danger[index] = score
+        return danger
+
+    def get(self, tile: str) -> float:
+        """查询一张牌的点炮风险"""
+        return self.danger[TILE_INDEX[tile]]
@@ -0,0 +1,163 @@
+# 牌局状态快照
+"""
+GameManager牌局状态的紧凑快照：牌墙和摸牌位置、四家隐藏手牌计数向量、副露、弃牌、标签、听牌集合、
+对手牌概率模型、动作日志和状态机阶段
+拷贝和恢复都不经过deepcopy：不可变的部分（牌墙、副露、弃牌、标签、阶段等元组）在快照之间共享，
+只有计数向量按大小复制，供搜索AI、模拟评估和调试工具在一次决策中大量拷贝
+"""
+from typing import List
+from source.action_log import RECORD, ActionLog
+from source.tile import TILE, TILE_INDEX, TILE_KINDS
+
+# GameManager中按值保存的状态机字段（列表保存为元组）
+PHASE_FIELDS = (
+    "game_state", "LAST_STATE", "current_player_index", "last_player_index",
+    "draw_tile", "discard_tile", "gang_tile", "hot_tile", "indicator_discard_tile",
+    "fanji_tile", "fanji_tiles", "winner_check_indexes", "reject_hu",
+    "HENGJI_ROUND", "hengji_start_player_index", "hengji_player_indexes",
+    "is_game_over", "decision_player_index", "decision_request", "decision_result", "seed",
+)
+LIST_FIELDS = {"fanji_tiles", "winner_check_indexes", "hengji_player_indexes"}
+
+# Player中按值保存的字段
+PLAYER_FIELDS = ("first_draw", "first_discard", "reject_hu", "jiaopai", "ting_info")
+
+NO_TAIL = -1
+
+
+class GameSnapshot:
+    """
+    牌局状态快照，座位顺序与GameManager.players相同
+    隐藏手牌除最后摸进的一张外总是按sort_hand的顺序排列，所以只保存计数向量和末尾那张牌（tails）
+    """
+    __slots__ = ("wall", "wall_pos", "hands", "tails", "melds", "discards", "tags", "waits",
+                 "players", "models", "phase", "banker", "winners", "actions")
+
+    @classmethod
+    def capture(cls, manager) -> "GameSnapshot":
+        """
+        保存GameManager的当前状态
+
+        Args:
+            manager: 游戏管理器（GameManager）
+        """
+        snapshot = cls.__new__(cls)
+        players = manager.players
+        snapshot.wall = tuple(TILE_INDEX[tile] for tile in manager.majiang_tiles)
+        snapshot.wall_pos = 0
+        snapshot.hands = []
+        snapshot.tails = []
+        for player in players:
+            concealed = player.hand["concealed"]
+            counts = [0] * TILE_KINDS
+            for tile in concealed:
+                counts[TILE_INDEX[tile]] += 1
+            snapshot.hands.append(counts)
+            # 末尾的牌比前一张小，说明是摸进后还没整理的牌
+            tail = NO_TAIL
+            if len(concealed) > 1 and TILE_INDEX[concealed[-1]] < TILE_INDEX[concealed[-2]]:
+                tail = TILE_INDEX[concealed[-1]]
+            snapshot.tails.append(tail)
+        snapshot.melds = [tuple(tuple((key, tuple(value) if isinstance(value, list) else value) for key, value in group.items())
+                                for group in player.hand["exposed"]) for player in players]
+        snapshot.discards = [tuple(TILE_INDEX[tile] for tile in player.discard_tiles) for player in players]
+        snapshot.tags = [tuple((tag["tag"], tag["source"]) for tag in player.tags) for player in players]
+        snapshot.waits = [player.wait_tracker.waits for player in players]  # WaitTracker只整体替换听牌集合，可以共享
+        snapshot.players = [tuple(getattr(player, name) for name in PLAYER_FIELDS) for player in players]
+
+        tile_model = manager.tile_model
+        snapshot.models = (tuple(tile_model.visible), tile_model.visible_total,
+                           tuple((tuple(model.hold_weights), tuple(model.wait_weights), model.discard_count, model.meld_count, model.declared)
+                                 for model in tile_model.models))
+        snapshot.phase = tuple(tuple(value) if name in LIST_FIELDS else value
+                               for name, value in ((name, getattr(manager, name, None)) for name in PHASE_FIELDS))
+        snapshot.banker = players.index(manager.banker) if manager.banker in players else None
+        snapshot.winners = tuple(players.index(player) for player in manager.winner)
+        log = manager.action_log
+        snapshot.actions = (log.seed, log.banker, log.test_mode, bytes(log.data)) if log is not None else None
+        return snapshot
+
+    def clone(self) -> "GameSnapshot":
+        """拷贝快照：复制计数向量和各座位的列表，元组部分共享"""
+        snapshot = GameSnapshot.__new__(GameSnapshot)
+        snapshot.wall = self.wall
+        snapshot.wall_pos = self.wall_pos
+        snapshot.hands = [counts.copy() for counts in self.hands]
+        snapshot.tails = self.tails.copy()
+        snapshot.melds = self.melds.copy()
+        snapshot.discards = self.discards.copy()
+        snapshot.tags = self.tags.copy()
+        snapshot.waits = self.waits.copy()
+        snapshot.players = self.players.copy()
+        snapshot.models = self.models
+        snapshot.phase = self.phase
+        snapshot.banker = self.banker
+        snapshot.winners = self.winners
+        snapshot.actions = self.actions
+        return snapshot
+
+    @property
+    def remaining(self) -> int:
+        """牌墙剩余张数"""
+        return len(self.wall) - self.wall_pos
+
+    def concealed(self, seat: int) -> List[str]:
+        """还原某个座位的隐藏手牌（与保存时的顺序相同）"""
+        tail = self.tails[seat]
+        counts = self.hands[seat]
+        tiles = []
+        for index, count in enumerate(counts):
+            if index == tail:
+                count -= 1
+            tiles.extend([TILE[index]] * count)
+        if tail != NO_TAIL:
+            tiles.append(TILE[tail])
+        return tiles
+
+    def restore(self, manager):
+        """
+        把快照恢复到GameManager（玩家对象保持不变，只改写牌局状态）
+
+        Args:
+            manager: 游戏管理器（GameManager），玩家与保存快照时相同
+        """
+        players = manager.players
+        manager.majiang_tiles = [TILE[index] for index in self.wall[self.wall_pos:]]
+        for seat, player in enumerate(players):
+            exposed = [{key: list(value) if isinstance(value, tuple) else value for key, value in group} for group in self.melds[seat]]
+            player.hand = {"exposed": exposed, "concealed": self.concealed(seat)}
+            player.discard_tiles = [TILE[index] for index in self.discards[seat]]
+            player.tags = [{"tag": tag, "source": source} for tag, source in self.tags[seat]]
+            for name, value in zip(PLAYER_FIELDS, self.players[seat]):
+                setattr(player, name, value)
+            tracker = player.wait_tracker
+            tracker.concealed = self.hands[seat].copy()
+            tracker.exposed = [TILE_INDEX[group["tiles"][0]] for group in exposed for _ in range(3)]
+            tracker.waits = self.waits[seat]
+            player.hand_version += 1
+            player.passport_cache = None
+
+        tile_model = manager.tile_model
+        visible, visible_total, models = self.models
+        tile_model.visible = list(visible)
+        tile_model.visible_total = visible_total
+        for model, (hold_weights, wait_weights, discard_count, meld_count, declared) in zip(tile_model.models, models):
+            model.hold_weights = list(hold_weights)
+            model.wait_weights = list(wait_weights)
+            model.discard_count = discard_count
+            model.meld_count = meld_count
+            model.declared = declared
+
+        for name, value in zip(PHASE_FIELDS, self.phase):
+            setattr(manager, name, list(value) if name in LIST_FIELDS else value)
+        manager.banker = players[self.banker] if self.banker is not None else None
+        manager.winner = [players[seat] for seat in self.winners]
+        if self.actions is not None:
+            seed, banker, test_mode, data = self.actions
+            manager.action_log = ActionLog(seed, banker, test_mode)
+            manager.action_log.data = bytearray(data)
+
+    def __repr__(self) -> str:
+        actions = len(self.actions[3]) // RECORD.size if self.actions else 0
+        return f"GameSnapshot(剩余{self.remaining}张, 阶段{self.phase[0]}, 动作{actions}条)"
+
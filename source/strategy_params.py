@@ -0,0 +1,86 @@
+# AI策略参数表
+"""
+规则AI（MajiangStrategy）的全部策略参数
+出牌排序、听牌加成、鸡牌调整、牌局阶段划分和碰/杠策略都从参数表读取，
+AI-0和AI-1只是两组不同的参数，调参时直接构造新的StrategyParams即可
+"""
+from dataclasses import dataclass, replace
+from typing import Optional, Tuple
+
+# 碰/杠策略
+CLAIM_EVALUATE = "evaluate"  # 碰/杠后能听牌或牌型变好才碰/杠
+CLAIM_RISK = "risk"  # 默认碰/杠，只在对手可能胡牌时放弃
+
+
+@dataclass(frozen=True)
+class StrategyParams:
+    """策略参数，分数越高的牌越不应该打出"""
+
+    # 牌局阶段：已使用的牌数小于middle_stage_used为早期，小于late_stage_used为中期，否则为后期
+    middle_stage_used: int = 70
+    late_stage_used: int = 95
+
+    # 基本优先级（级别越高越不应该打出）
+    level_triplet: int = 5  # 刻子/暗杠
+    level_only_pair: int = 4  # 唯一的对子（将牌）
+    level_pair: int = 3  # 普通对子
+    level_composed: int = 6  # 已组成的面子/搭子
+    level_connected: int = 2  # 连张搭子
+    level_gapped: int = 1  # 嵌张搭子
+    level_isolated: int = 0  # 孤张
+
+    # 鸡牌：冲锋鸡/横鸡只在牌局进行到chicken_used_limit之前打出
+    chicken_used_limit: int = 90
+    chicken_charge_delta: int = -3  # 牌型较好时打冲锋鸡
+    chicken_cross_delta: int = -2  # 已经听牌时打横鸡
+    chicken_keep_delta: int = 4  # 手牌不好时保留鸡牌
+    chicken_release_delta: int = -1  # 手牌较好时可以打出鸡牌
+    good_hand_melds: int = 2  # 手牌较好：面子数不少于该值
+    good_hand_tatsus: int = 2  # 手牌较好：搭子数不少于该值
+
+    # 特殊牌型
+    flush_suit_count: int = 9  # 某花色张数不少于该值时有清一色潜力
+    flush_main_delta: int = 1  # 清一色主花色
+    flush_other_delta: int = -1  # 清一色非主花色
+    seven_pairs_potential: float = 0.7  # 七对子潜力超过该值时单张优先打出
+    pengpeng_potential: float = 0.7  # 碰碰胡潜力超过该值时单张优先打出
+    single_tile_delta: int = -1
+    big_pattern_potential: float = 0.8  # 七对子/碰碰胡/清一色潜力超过该值为大牌
+    break_composed_potential: float = 0.9  # 大牌潜力超过该值时可以拆已组成的面子/搭子
+    level_break_composed: int = 2
+
+    # 牌局阶段调整
+    early_terminal_delta: int = -1  # 早期幺九孤张
+    late_safe_danger: float = 10  # 后期点炮风险低于该值为安全牌
+    late_safe_delta: int = -1
+
+    # 分数：优先级换算为分数，优先级不超过danger_level_limit的牌按阶段扣除点炮风险
+    level_score: float = 100
+    danger_level_limit: int = 2
+    danger_weights: Tuple[float, float, float] = (0.2, 0.5, 1.0)  # 早期/中期/后期
+    shanten_weight: float = 30  # 打出后向听数每比最好打法多1
+    effective_weight: float = 0.5  # 有效牌每多1张
+
+    # 听牌加成（负数，越小越优先打出）
+    ting_bonuses: Tuple[float, float, float] = (-200, -300, -500)  # 早期/中期/后期
+    ting_poor_quality: float = 50  # 早期听牌质量低于该值（边张/卡张）时加成降低
+    ting_poor_bonus: float = -100
+    exposed_chicken_ting_bonus: float = -50  # 自己每暴露一张鸡牌
+    ting_score_cap: float = -1000  # 能听牌的打法分数不高于该值
+
+    # 碰/杠
+    claim_policy: str = CLAIM_EVALUATE
+    claim_avoid_chicken: bool = True  # 不碰/杠别人打的冲锋鸡和横鸡
+    peng_risk_limit: Optional[float] = None  # 碰牌后手里每张牌让对手胡牌的概率都不低于该值时不碰
+    qiang_gang_risk_limit: Optional[float] = None  # 加杠的牌让对手抢杠胡的概率不低于该值时不加杠
+
+
+# AI-0：碰/杠后能听牌或牌型变好才碰/杠
+AI0_PARAMS = StrategyParams()
+
+# AI-1：默认碰/杠，用对手牌概率模型避开点炮和抢杠胡
+AI1_PARAMS = replace(AI0_PARAMS,
+    claim_policy=CLAIM_RISK,
+    claim_avoid_chicken=False,
+    peng_risk_limit=0.12,
+    qiang_gang_risk_limit=0.1)
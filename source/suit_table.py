@@ -0,0 +1,278 @@
+# 单花色分解表
+"""
+预先生成单一花色（1-9九个数字）的分解查找表，供规则引擎做常数时间的胡牌判断
+
+单花色的计数向量(9格，每格0-4张)用以5为底的整数编码作为key：
+    key = count[0] * 5**0 + count[1] * 5**1 + ... + count[8] * 5**8
+表中只收录能完整拆分为"若干面子(刻子/顺子) + 至多一个对子"的计数向量，
+value 为该向量所有可能的分解方式集合 {(面子数, 是否有对子), ...}
+"""
+from itertools import combinations_with_replacement
+from typing import Dict, FrozenSet, List, Tuple
+from source.tile import SUIT_SIZE, TILE_KINDS
+
+# 各花色在27格计数向量中的起始位置：万/条/筒
+SUIT_STARTS = tuple(range(0, TILE_KINDS, SUIT_SIZE))
+
+# 以5为底编码时每个数字位的权重
+SUIT_KEY_WEIGHTS = tuple(5 ** rank for rank in range(SUIT_SIZE))
+
+# 手牌最多组成的面子数
+MAX_MELDS = 4
+
+
+def suit_key(counts: List[int], start: int = 0) -> int:
+    """计算某一花色的以5为底的编码
+
+    Args:
+        counts: 计数向量（27格的整手牌或9格的单花色）
+        start: 花色在计数向量中的起始位置
+
+    Returns:
+        int: 该花色9个数字的编码
+    """
+    key = 0
+    for rank in range(SUIT_SIZE - 1, -1, -1):
+        key = key * 5 + counts[start + rank]
+    return key
+
+
+def key_to_suit_counts(key: int) -> List[int]:
+    """把单花色编码还原为9格计数向量"""
+    counts = []
+    for _ in range(SUIT_SIZE):
+        key, count = divmod(key, 5)
+        counts.append(count)
+    return counts
+
+
+def _meld_shapes() -> List[Tuple[int, ...]]:
+    """单花色内所有面子的形状：9种刻子 + 7种顺子，每个形状为9格计数向量"""
+    shapes = []
+    for rank in range(SUIT_SIZE):
+        shape = [0] * SUIT_SIZE
+        shape[rank] = 3
+        shapes.append(tuple(shape))
+    for rank in range(SUIT_SIZE - 2):
+        shape = [0] * SUIT_SIZE
+        shape[rank] = shape[rank + 1] = shape[rank + 2] = 1
+        shapes.append(tuple(shape))
+    return shapes
+
+
+def _build_decomposition_table() -> Dict[int, FrozenSet[Tuple[int, bool]]]:
+    """枚举0-4个面子和可选的一个对子的所有组合，生成单花色分解表"""
+    table: Dict[int, set] = {}
+    shapes = _meld_shapes()
+    for melds in range(MAX_MELDS + 1):
+        for combo in combinations_with_replacement(shapes, melds):
+            base = [0] * SUIT_SIZE
+            for shape in combo:
+                for rank, count in enumerate(shape):
+                    base[rank] += count
+            if max(base) > 4:
+                continue
+            # 不带对子
+            table.setdefault(suit_key(base), set()).add((melds, False))
+            # 带一个对子
+            for rank in range(SUIT_SIZE):
+                if base[rank] <= 2:
+                    base[rank] += 2
+                    table.setdefault(suit_key(base), set()).add((melds, True))
+                    base[rank] -= 2
+    return {key: frozenset(decompositions) for key, decompositions in table.items()}
+
+
+# 单花色分解表：key -> {(面子数, 是否有对子)}，模块加载时生成一次
+DECOMPOSITION_TABLE = _build_decomposition_table()
+
+
+def get_suit_decompositions(counts: List[int], start: int) -> FrozenSet[Tuple[int, bool]]:
+    """查询某一花色的所有分解方式，不能完整拆分时返回空集合"""
+    return DECOMPOSITION_TABLE.get(suit_key(counts, start), frozenset())
+
+
+def can_combine(decompositions: List[FrozenSet[Tuple[int, bool]]], needed: int) -> bool:
+    """
+    组合各花色的分解方式，检查能否恰好组成 needed 个面子 + 1 个对子
+
+    Args:
+        decompositions: 三个花色各自的分解方式集合
+        needed: 手牌需组成的面子数
+
+    Returns:
+        bool: 是否存在满足条件的组合
+    """
+    reachable = {(0, 0)}
+    for suit_decompositions in decompositions:
+        if not suit_decompositions:
+            return False
+        reachable = {
+            (melds + suit_melds, pairs + suit_pair)
+            for melds, pairs in reachable
+            for suit_melds, suit_pair in suit_decompositions
+            if melds + suit_melds <= needed and pairs + suit_pair <= 1
+        }
+        if not reachable:
+            return False
+    return (needed, 1) in reachable
+
+
+def is_standard_win(counts: List[int], needed: int) -> bool:
+    """
+    判断27格计数向量能否组成 needed 个面子 + 1 个对子
+    三次查表得到各花色的分解方式，再组合检查面子数和对子数
+
+    Args:
+        counts: 隐藏手牌加上要检查的牌的计数向量
+        needed: 手牌需组成的面子数（4 - 副露组数）
+
+    Returns:
+        bool: 是否可以组成常规胡牌
+    """
+    # 同一种牌超过4张时编码会进位，直接判定不能胡
+    if needed < 0 or sum(counts) != needed * 3 + 2 or max(counts) > 4:
+        return False
+    return can_combine([get_suit_decompositions(counts, start) for start in SUIT_STARTS], needed)
+
+
+# 单花色搭子表：key -> ((是否有对子, 面子数, 最多搭子数), ...)，只收录能达到的 (是否有对子, 面子数)
+# 向听数计算时按需填充，同一花色形状只计算一次
+SUIT_BLOCK_TABLE: Dict[int, Tuple[Tuple[int, int, int], ...]] = {0: ((0, 0, 0),)}
+
+
+def get_suit_blocks(key: int) -> Tuple[Tuple[int, int, int], ...]:
+    """
+    查询某一花色拆成面子、搭子和对子的所有最优方式
+    从最小的有牌数字开始，依次尝试取出刻子、顺子、对子(做将或做搭子)、两面/坎张搭子或单张，
+    记忆化递归在以5为底的编码上进行
+
+    Args:
+        key: 单花色的以5为底的编码
+
+    Returns:
+        tuple: ((是否有对子, 面子数, 最多搭子数), ...)
+    """
+    blocks = SUIT_BLOCK_TABLE.get(key)
+    if blocks is not None:
+        return blocks
+
+    counts = key_to_suit_counts(key)
+    rank = next(rank for rank, count in enumerate(counts) if count)
+    weight = SUIT_KEY_WEIGHTS[rank]
+    best: Dict[Tuple[int, int], int] = {}
+
+    def merge(rest_key: int, melds: int, tatsu: int, pair: int):
+        """把取出的一组牌与剩余部分的最优拆法合并"""
+        for rest_pair, rest_melds, rest_tatsu in get_suit_blocks(rest_key):
+            if rest_pair + pair > 1 or rest_melds + melds > MAX_MELDS:
+                continue
+            state = (rest_pair + pair, rest_melds + melds)
+            if best.get(state, -1) < rest_tatsu + tatsu:
+                best[state] = rest_tatsu + tatsu
+
+    count = counts[rank]
+    # 刻子
+    if count >= 3:
+        merge(key - 3 * weight, 1, 0, 0)
+    if rank + 2 < SUIT_SIZE:
+        # 顺子
+        if counts[rank + 1] and counts[rank + 2]:
+            merge(key - weight - SUIT_KEY_WEIGHTS[rank + 1] - SUIT_KEY_WEIGHTS[rank + 2], 1, 0, 0)
+        # 坎张搭子
+        if counts[rank + 2]:
+            merge(key - weight - SUIT_KEY_WEIGHTS[rank + 2], 0, 1, 0)
+    # 两面/边张搭子
+    if rank + 1 < SUIT_SIZE and counts[rank + 1]:
+        merge(key - weight - SUIT_KEY_WEIGHTS[rank + 1], 0, 1, 0)
+    # 对子做将或做搭子
+    if count >= 2:
+        merge(key - 2 * weight, 0, 0, 1)
+        merge(key - 2 * weight, 0, 1, 0)
+    # 孤张
+    merge(key - weight, 0, 0, 0)
+
+    blocks = tuple((pair, melds, tatsu) for (pair, melds), tatsu in best.items())
+    SUIT_BLOCK_TABLE[key] = blocks
+    return blocks
+
+
+def standard_shanten(counts: List[int], exposed_melds: int) -> int:
+    """
+    计算常规牌型（4个面子 + 1个对子）的向听数
+    向听数 = 8 - 2*面子数 - 搭子数 - 是否有将，面子数与搭子数之和不超过4
+
+    Args:
+        counts: 隐藏手牌的27格计数向量
+        exposed_melds: 副露组数，计为已完成的面子
+
+    Returns:
+        int: 向听数，0表示听牌，-1表示已经胡牌
+    """
+    return merge_suit_blocks([get_suit_blocks(suit_key(counts, start)) for start in SUIT_STARTS], exposed_melds)
+
+
+def merge_suit_blocks(suit_blocks: List[Tuple[Tuple[int, int, int], ...]], exposed_melds: int) -> int:
+    """
+    合并三个花色的搭子表，得到常规牌型的向听数
+    只改动某一花色时，其他花色的合并结果可以直接复用（见combine_suit_blocks）
+
+    Args:
+        suit_blocks: 三个花色各自的搭子表（get_suit_blocks的结果）
+        exposed_melds: 副露组数
+
+    Returns:
+        int: 向听数
+    """
+    combined = {(0, exposed_melds): 0}
+    for blocks in suit_blocks[:-1]:
+        combined = combine_suit_blocks(combined, blocks)
+    return blocks_shanten(combined, suit_blocks[-1])
+
+
+def combine_suit_blocks(combined: Dict[Tuple[int, int], int],
+                        blocks: Tuple[Tuple[int, int, int], ...]) -> Dict[Tuple[int, int], int]:
+    """
+    把一个花色的搭子表合并到已合并的结果中
+
+    Args:
+        combined: 已合并的结果，(是否有对子, 面子数) -> 最多搭子数
+        blocks: 要合并的花色的搭子表
+
+    Returns:
+        dict: 合并后的结果
+    """
+    merged: Dict[Tuple[int, int], int] = {}
+    for (pair, melds), tatsu in combined.items():
+        for suit_pair, suit_melds, suit_tatsu in blocks:
+            if pair + suit_pair > 1 or melds + suit_melds > MAX_MELDS:
+                continue
+            state = (pair + suit_pair, melds + suit_melds)
+            if merged.get(state, -1) < tatsu + suit_tatsu:
+                merged[state] = tatsu + suit_tatsu
+    return merged
+
+
+def blocks_shanten(combined: Dict[Tuple[int, int], int], blocks: Tuple[Tuple[int, int, int], ...]) -> int:
+    """
+    合并最后一个花色的搭子表并直接求向听数，面子数与搭子数之和不超过4
+
+    Args:
+        combined: 另外两个花色的合并结果
+        blocks: 最后一个花色的搭子表
+
+    Returns:
+        int: 向听数
+    """
+    shanten = 8
+    for (pair, melds), tatsu in combined.items():
+        for suit_pair, suit_melds, suit_tatsu in blocks:
+            if pair + suit_pair > 1 or melds + suit_melds > MAX_MELDS:
+                continue
+            total_melds = melds + suit_melds
+            blocks_left = MAX_MELDS - total_melds
+            total_tatsu = tatsu + suit_tatsu
+            value = 8 - 2 * total_melds - (total_tatsu if total_tatsu < blocks_left else blocks_left) - pair - suit_pair
+            if value < shanten:
+                shanten = value
+    return shanten
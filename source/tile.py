@@ -2,6 +2,7 @@
 """
 定义麻将游戏中使用的牌相关常量和辅助函数
 """
+from typing import Dict, List, Tuple
 
 # 麻将牌花色
 TILE_SUITS = ['万', '条', '筒']
@@ -15,6 +16,15 @@ TILE = [f"{value}{suit}" for suit in TILE_SUITS for value in TILE_VALUES]
 # 完整的牌堆（108张，每种牌4张）
 TILES = TILE * 4
 
+# 牌的整数编码：万 0-8，条 9-17，筒 18-26（与TILE的顺序一致）
+TILE_KINDS = len(TILE)
+
+# 每种花色的牌数
+SUIT_SIZE = len(TILE_VALUES)
+
+# 牌面字符串到整数编码的映射
+TILE_INDEX = {tile: index for index, tile in enumerate(TILE)}
+
 def get_tile_value(tile: str) -> int:
     """获取麻将牌的数值部分
     
@@ -60,3 +70,68 @@ def create_tile(value: int, suit: str) -> str:
     """
     return f"{value}{suit}"
 
+
+def tile_to_index(tile: str) -> int:
+    """把麻将牌字符串转换为整数编码
+
+    Args:
+        tile: 麻将牌字符串，如 "1万"
+
+    Returns:
+        int: 牌的整数编码(0-26)，如 "1万" -> 0，"1条" -> 9
+    """
+    index = TILE_INDEX.get(tile)
+    if index is None:
+        raise ValueError(f"牌 {tile} 不是有效的牌面")
+    return index
+
+def index_to_tile(index: int) -> str:
+    """把整数编码转换为麻将牌字符串
+
+    Args:
+        index: 牌的整数编码(0-26)
+
+    Returns:
+        str: 麻将牌字符串，如 0 -> "1万"
+    """
+    return TILE[index]
+
+def tiles_to_counts(tiles: List[str]) -> List[int]:
+    """把牌列表转换为27格的计数向量
+
+    Args:
+        tiles: 麻将牌字符串列表，如 ["1万", "1万", "3条"]
+
+    Returns:
+        List[int]: 长度为27的列表，第i格为编码为i的牌的张数
+    """
+    counts = [0] * TILE_KINDS
+    for tile in tiles:
+        counts[tile_to_index(tile)] += 1
+    return counts
+
+def counts_to_tiles(counts: List[int]) -> List[str]:
+    """把27格的计数向量转换回牌列表（按万条筒、从小到大排列）
+
+    Args:
+        counts: 长度为27的计数向量
+
+    Returns:
+        List[str]: 麻将牌字符串列表
+    """
+    return [TILE[index] for index, count in enumerate(counts) for _ in range(count)]
+
+def hand_to_counts(hand: Dict) -> Tuple[List[int], List[int]]:
+    """把 dict 格式的手牌转换为计数向量格式
+
+    Args:
+        hand: 玩家手牌，包含"concealed"（隐藏手牌）和"exposed"（明牌）
+
+    Returns:
+        tuple: (隐藏手牌的27格计数向量, 副露牌编码列表)
+            副露牌编码列表把每组副露的前3张牌展开（杠牌只取前3张），与胡牌判断的口径一致
+    """
+    concealed = [tile for tile in hand["concealed"] if isinstance(tile, str) and tile.strip()]
+    exposed = [tile_to_index(tile) for group in hand["exposed"] if isinstance(group, dict)
+               for tile in group["tiles"][:3]]
+    return tiles_to_counts(concealed), exposed
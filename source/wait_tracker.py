@@ -0,0 +1,81 @@
+# 听牌状态跟踪
+"""
+玩家的听牌状态跟踪器
+玩家每次摸牌、出牌、碰、杠、胡时增量更新手牌的计数向量，并在手牌为13张（含副露）时刷新听牌集合，
+这样"别人打出的牌能不能胡"只需查一次集合，不必每次都做完整的胡牌判断
+"""
+from typing import Dict, List
+from source.public import Tag
+from source.rule import Rule
+from source.tile import TILE, TILE_KINDS, hand_to_counts, tile_to_index
+
+
+class WaitTracker:
+    """单个玩家的听牌状态：听的牌及对应的胡牌类型"""
+
+    # 所有跟踪器共用一个Rule实例（听牌结果缓存本身也是共享的）
+    rule = Rule()
+
+    def __init__(self):
+        self.concealed = [0] * TILE_KINDS  # 隐藏手牌的27格计数向量
+        self.exposed: List[int] = []  # 副露牌编码列表（每组只取前3张）
+        self.waits: Dict[int, List[Tag]] = {}  # 听的牌编码 -> 胡牌类型列表
+        self.refresh_count = 0  # 听牌集合刷新次数
+
+    def rebuild(self, hand: Dict[str, List]):
+        """
+        按完整手牌重新生成计数向量和听牌集合，用于重置或直接修改手牌之后
+
+        Args:
+            hand: 玩家手牌，包含"concealed"（隐藏牌）和"exposed"（副露牌）
+        """
+        self.concealed, self.exposed = hand_to_counts(hand)
+        self._refresh()
+
+    def add(self, tile: str):
+        """隐藏手牌加入一张牌（摸牌/胡牌）"""
+        self.concealed[tile_to_index(tile)] += 1
+        self._refresh()
+
+    def remove(self, tile: str):
+        """隐藏手牌移除一张牌（出牌/加杠）"""
+        self.concealed[tile_to_index(tile)] -= 1
+        self._refresh()
+
+    def meld(self, tile: str, from_concealed: int):
+        """
+        从隐藏手牌中取出若干张牌组成副露（碰/明杠/暗杠）
+
+        Args:
+            tile: 副露的牌
+            from_concealed: 从隐藏手牌中取出的张数（碰2张，明杠3张，暗杠4张）
+        """
+        index = tile_to_index(tile)
+        self.concealed[index] -= from_concealed
+        self.exposed.extend([index] * 3)
+        self._refresh()
+
+    def _refresh(self):
+        """手牌为13张（含副露）时更新听牌集合，其他张数（摸牌后、胡牌后）时清空"""
+        if sum(self.concealed) + len(self.exposed) == 13:
+            self.waits = {index: list(win_type) for index, win_type in self.rule.get_cached_waits(self.concealed, self.exposed)}
+        else:
+            self.waits = {}
+        self.refresh_count += 1
+
+    @property
+    def is_ting(self) -> bool:
+        """是否听牌"""
+        return bool(self.waits)
+
+    def can_hu(self, tile: str) -> bool:
+        """当前手牌能否胡这张牌"""
+        return tile_to_index(tile) in self.waits
+
+    def get_win_types(self, tile: str) -> List[Tag]:
+        """胡这张牌的胡牌类型，不能胡时为空列表"""
+        return list(self.waits.get(tile_to_index(tile), []))
+
+    def get_wait_tiles(self) -> List[str]:
+        """听的牌列表"""
+        return [TILE[index] for index in sorted(self.waits)]
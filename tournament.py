@@ -0,0 +1,206 @@
+# AI对战锦标赛
+"""
+多进程无界面对战，比较不同版本AI的强弱
+
+1. 四个座位各指定一个AI版本（与settings.opponent_ai_version_list相同的编号：0/1/2/3）
+2. 第i局的随机种子为 --seed + i，相同参数的两次运行发牌完全相同
+3. 对局按批分散到进程池，每批在子进程中先汇总再返回
+4. 按座位和按AI版本汇总：胡牌率、点炮率、冲鸡/包鸡分数、胡牌类型分布、每局积分变化（均值和95%置信区间）
+5. 报告总用时和每秒对局数
+
+用法：
+    python tournament.py --games 10000                   # 座位AI版本默认为 1 0 1 0
+    python tournament.py --games 20000 --seats 1 1 0 0 --rotate
+    python tournament.py --games 200 --seats 2 1 1 1 --time-limit 0.2
+    python tournament.py --games 1000 --workers 4 --batch 50
+"""
+import argparse
+import math
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+from settings import Settings
+from source.headless import GameRecord, HeadlessRunner
+
+# 进程内的无界面对局（每个进程创建一次）
+_runner: Optional[HeadlessRunner] = None
+
+
+@dataclass
+class SeatStats:
+    """一个座位（或一个AI版本）的累计统计"""
+    games: int = 0
+    wins: int = 0
+    deal_ins: int = 0
+    gain_ji: int = 0  # 冲鸡分数
+    loss_ji: int = 0  # 包鸡分数
+    score: float = 0.0  # 积分变化之和
+    score_squares: float = 0.0  # 积分变化的平方和（计算置信区间）
+    hu_types: Counter = field(default_factory=Counter)
+
+    def add_game(self, record: GameRecord, seat: int):
+        """累加一局中某个座位的结果"""
+        delta = record.score_deltas[seat]
+        self.games += 1
+        self.wins += seat in record.winners
+        self.deal_ins += record.deal_ins[seat]
+        self.gain_ji += record.gain_ji[seat]
+        self.loss_ji += record.loss_ji[seat]
+        self.score += delta
+        self.score_squares += delta * delta
+        self.hu_types.update(record.hu_types[seat])
+
+    def merge(self, other: "SeatStats"):
+        """合并另一份统计"""
+        self.games += other.games
+        self.wins += other.wins
+        self.deal_ins += other.deal_ins
+        self.gain_ji += other.gain_ji
+        self.loss_ji += other.loss_ji
+        self.score += other.score
+        self.score_squares += other.score_squares
+        self.hu_types.update(other.hu_types)
+
+    def mean_score(self) -> Tuple[float, float]:
+        """每局积分变化的均值和95%置信区间半宽"""
+        if not self.games:
+            return 0.0, 0.0
+        mean = self.score / self.games
+        if self.games < 2:
+            return mean, 0.0
+        variance = max(0.0, (self.score_squares - self.games * mean * mean) / (self.games - 1))
+        return mean, 1.96 * math.sqrt(variance / self.games)
+
+
+@dataclass
+class BatchStats:
+    """一批对局的汇总"""
+    seats: List[SeatStats] = field(default_factory=lambda: [SeatStats() for _ in range(4)])
+    versions: Dict[int, SeatStats] = field(default_factory=dict)
+    games: int = 0
+    draws: int = 0
+    steps: int = 0
+
+    def merge(self, other: "BatchStats"):
+        """合并另一批对局"""
+        for mine, theirs in zip(self.seats, other.seats):
+            mine.merge(theirs)
+        for version, stats in other.versions.items():
+            self.versions.setdefault(version, SeatStats()).merge(stats)
+        self.games += other.games
+        self.draws += other.draws
+        self.steps += other.steps
+
+
+def seat_versions(seats: Sequence[int], game_index: int, rotate: bool) -> List[int]:
+    """第game_index局四个座位的AI版本：rotate时每局把座位安排轮转一位"""
+    if not rotate:
+        return list(seats)
+    shift = game_index % 4
+    return list(seats[shift:]) + list(seats[:shift])
+
+
+def play_batch(task: Tuple[List[int], int, int, int, bool, float, int]) -> BatchStats:
+    """
+    进程池任务：对局一批并汇总
+
+    Args:
+        task: (座位AI版本, 基础种子, 第一局的编号, 局数, 是否轮转座位, AI思考时间, 树搜索节点预算)
+    """
+    global _runner
+    seats, seed, first, count, rotate, time_limit, node_budget = task
+    if _runner is None:
+        settings = Settings()
+        settings.ai_time_limit = time_limit  # 无界面模式不等待，只作为AI-2/AI-3的计算预算
+        settings.ismcts_node_budget = node_budget
+        settings.ai_workers = 1  # 已经按局分配到多个进程，AI-2不再使用进程池
+        _runner = HeadlessRunner(settings)
+
+    stats = BatchStats()
+    for game_index in range(first, first + count):
+        versions = seat_versions(seats, game_index, rotate)
+        _runner.set_ai_versions(versions)
+        record = _runner.play_game(seed + game_index)
+        stats.games += 1
+        stats.draws += not record.winners
+        stats.steps += record.steps
+        for seat, version in enumerate(versions):
+            stats.seats[seat].add_game(record, seat)
+            stats.versions.setdefault(version, SeatStats()).add_game(record, seat)
+    return stats
+
+
+def run(args) -> Tuple[BatchStats, float]:
+    """把全部对局按批分给进程池，返回汇总结果和用时"""
+    tasks = []
+    for first in range(0, args.games, args.batch):
+        count = min(args.batch, args.games - first)
+        tasks.append((args.seats, args.seed, first, count, args.rotate, args.time_limit, args.node_budget))
+
+    total = BatchStats()
+    start = time.time()
+    with ProcessPoolExecutor(max_workers=args.workers or None) as executor:
+        for done, stats in enumerate(executor.map(play_batch, tasks), 1):
+            total.merge(stats)
+            if args.progress and done % args.progress == 0:
+                elapsed = time.time() - start
+                print(f"已完成{total.games}/{args.games}局，{total.games / elapsed:.1f}局/秒")
+    return total, time.time() - start
+
+
+def print_table(title: str, rows: List[Tuple[str, SeatStats]]):
+    """打印统计表"""
+    print(f"\n{title}")
+    print(f"{'':>8} {'局数':>6} {'胡牌率':>7} {'点炮率':>7} {'冲鸡':>7} {'包鸡':>7} {'每局积分':>16}")
+    for name, stats in rows:
+        games = stats.games or 1
+        mean, half_width = stats.mean_score()
+        print(f"{name:>8} {stats.games:>6} {stats.wins / games:>7.1%} {stats.deal_ins / games:>7.1%} "
+              f"{stats.gain_ji / games:>7.2f} {stats.loss_ji / games:>7.2f} {mean:>+8.2f} ±{half_width:<6.2f}")
+
+
+def print_report(args, total: BatchStats, elapsed: float):
+    """打印锦标赛报告"""
+    games = total.games or 1
+    print(f"\n座位AI版本：{' '.join(str(v) for v in args.seats)}{'（每局轮转）' if args.rotate else ''}")
+    print(f"对局{total.games}局，流局率{total.draws / games:.1%}，平均每局{total.steps / games:.0f}步")
+    print(f"用时{elapsed:.1f}秒，{total.games / elapsed:.1f}局/秒")
+
+    if not args.rotate:
+        print_table("按座位：", [(f"座位{seat}(AI-{version})", stats)
+                                for seat, (version, stats) in enumerate(zip(args.seats, total.seats))])
+    print_table("按AI版本：", [(f"AI-{version}", stats) for version, stats in sorted(total.versions.items())])
+
+    print("\n胡牌类型分布（每种AI版本胡牌中各类型的占比）：")
+    for version, stats in sorted(total.versions.items()):
+        hu_total = sum(stats.hu_types.values()) or 1
+        distribution = "  ".join(f"{tag.replace(' ', '')} {count / hu_total:.1%}" for tag, count in stats.hu_types.most_common())
+        print(f"  AI-{version}: {distribution or '无'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多进程无界面AI对战")
+    parser.add_argument("--games", type=int, default=1000, help="对局数")
+    parser.add_argument("--seats", type=int, nargs=4, default=[1, 0, 1, 0], choices=range(4), metavar="VERSION",
+                        help="四个座位的AI版本（0/1/2/3）")
+    parser.add_argument("--rotate", action="store_true", help="每局轮转座位安排，抵消座位的影响（只按AI版本汇总）")
+    parser.add_argument("--seed", type=int, default=0, help="基础随机种子，第i局的种子为seed+i")
+    parser.add_argument("--workers", type=int, default=0, help="进程数，0表示使用全部CPU核心")
+    parser.add_argument("--batch", type=int, default=20, help="每个进程池任务的局数")
+    parser.add_argument("--time-limit", type=float, default=0, help="AI-2/AI-3每次决策的计算时间（秒）")
+    parser.add_argument("--node-budget", type=int, default=0, help="AI-3每次决策的节点预算")
+    parser.add_argument("--progress", type=int, default=0, help="每完成多少批打印一次进度，0表示不打印")
+    args = parser.parse_args()
+    if 3 in args.seats and args.time_limit <= 0 and args.node_budget <= 0:
+        print("提示：AI-3没有时间或节点预算，将沿用AI-1的决策")
+    if 2 in args.seats and args.time_limit <= 0:
+        print("提示：AI-2没有时间预算，将沿用AI-1的出牌排序")
+
+    total, elapsed = run(args)
+    print_report(args, total, elapsed)
+
+
+if __name__ == "__main__":
+    main()